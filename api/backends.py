@@ -0,0 +1,483 @@
+"""Pluggable database backends for the Oracle Demo API
+
+ORACLE_BACKEND=oracle (default) connects to the real Oracle instances with oracledb.
+ORACLE_BACKEND=fake serves the same pool/connect/cursor/execute/fetch surface from
+in-process SQLite databases (one per instance) so the API and load generator can
+be benchmarked end to end on a single machine with no network services.
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from itertools import cycle, islice
+
+import oracledb
+
+ORACLE_BACKEND = os.getenv("ORACLE_BACKEND", "oracle").lower()
+
+# Fake backend configuration
+FAKE_ORACLE_EMPLOYEES = int(os.getenv("FAKE_ORACLE_EMPLOYEES", "10"))
+FAKE_ORACLE_SEED = int(os.getenv("FAKE_ORACLE_SEED", "42"))
+FAKE_ORACLE_CONNECT_LATENCY_MS = float(os.getenv("FAKE_ORACLE_CONNECT_LATENCY_MS", "0"))
+FAKE_ORACLE_LATENCY_MS = float(os.getenv("FAKE_ORACLE_LATENCY_MS", "0"))
+# Per-query overrides keyed by a case-insensitive SQL substring, e.g. {"PARALLEL": 40, "NO_INDEX": 250}
+FAKE_ORACLE_QUERY_LATENCY_MS = json.loads(os.getenv("FAKE_ORACLE_QUERY_LATENCY_MS", "{}"))
+# Force result sizes by repeating/truncating the real result, e.g. {"FULL(e) */": 10000}
+FAKE_ORACLE_QUERY_ROWS = json.loads(os.getenv("FAKE_ORACLE_QUERY_ROWS", "{}"))
+# Latency of each fetch round trip after the execute (rows beyond prefetchrows, arraysize at a time)
+FAKE_ORACLE_ROUND_TRIP_MS = float(os.getenv("FAKE_ORACLE_ROUND_TRIP_MS", "0"))
+
+# Same rows as oracle/create-schema.sql: (employee_id, first_name, last_name, salary, days since hire)
+SEED_EMPLOYEES = [
+    (1001, 'John', 'Doe', 60000, 100),
+    (1002, 'Jane', 'Smith', 65000, 200),
+    (1003, 'Alice', 'Johnson', 75000, 300),
+    (2001, 'Bob', 'Wilson', 55000, 50),
+    (2002, 'Carol', 'Brown', 70000, 150),
+    (2003, 'David', 'Miller', 80000, 250),
+    (2004, 'Emma', 'Davis', 65000, 75),
+    (2005, 'Frank', 'Garcia', 72000, 125),
+    (2006, 'Grace', 'Rodriguez', 68000, 175),
+    (2007, 'Henry', 'Martinez', 85000, 225),
+]
+
+SQLITE_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+TIMESTAMP_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$')
+COMMENT_PATTERN = re.compile(r'/\*.*?\*/', re.DOTALL)
+POSITIONAL_BIND_PATTERN = re.compile(r':(\d+)\b')
+DUAL_PATTERN = re.compile(r'\bFROM\s+DUAL\b', re.IGNORECASE)
+TRUNC_PATTERN = re.compile(r'\bTRUNC\s*\(', re.IGNORECASE)
+ORA_ROWSCN_PATTERN = re.compile(r'\bORA_ROWSCN\b', re.IGNORECASE)
+PLAN_LOOKUP_PATTERN = re.compile(r'\bprev_sql_id\b', re.IGNORECASE)
+DISPLAY_CURSOR_PATTERN = re.compile(r'\bDBMS_XPLAN\.DISPLAY_CURSOR\b', re.IGNORECASE)
+SQL_ID_ALPHABET = '0123456789abcdfghjkmnpqrstuvwxyz'
+
+
+class OracleBackend:
+    """Real Oracle connections via python-oracledb"""
+    name = "oracle"
+
+    def connect(self, instance_type, instance_config, user, password, sid):
+        conn_str = f"{user}/{password}@{instance_config['host']}:{instance_config['port']}/{sid}"
+        return oracledb.connect(conn_str, mode=oracledb.DEFAULT_AUTH)
+
+    def create_pool(self, instance_type, instance_config, user, password, sid, minimum, maximum,
+                    wait_timeout_ms, session_callback=None):
+        # Closing a connection acquired from the pool releases it back to the pool
+        return oracledb.create_pool(
+            user=user, password=password,
+            dsn=f"{instance_config['host']}:{instance_config['port']}/{sid}",
+            min=minimum, max=maximum, increment=1,
+            getmode=oracledb.POOL_GETMODE_TIMEDWAIT, wait_timeout=wait_timeout_ms,
+            session_callback=session_callback
+        )
+
+
+def oracle_trunc(value, fmt=None):
+    """SQLite stand-in for Oracle TRUNC(date[, 'MONTH'])"""
+    if value is None:
+        return None
+    moment = datetime.strptime(value, SQLITE_TIMESTAMP_FORMAT)
+    if fmt and fmt.upper() in ('MONTH', 'MM', 'MON'):
+        moment = moment.replace(day=1)
+    return moment.replace(hour=0, minute=0, second=0).strftime(SQLITE_TIMESTAMP_FORMAT)
+
+
+def translate_sql(sql):
+    """Translate the Oracle dialect used by the API into SQLite, or None for no-op statements"""
+    statement = COMMENT_PATTERN.sub(' ', sql).strip()
+    leading = statement.upper()
+    # Session tuning and PL/SQL correlation calls have no SQLite equivalent
+    if leading.startswith('ALTER SESSION') or leading.startswith('BEGIN'):
+        return None
+    statement = DUAL_PATTERN.sub('', statement)
+    statement = TRUNC_PATTERN.sub('ORACLE_TRUNC(', statement)
+    # Rows changed since the database opened - rises with every committed write, like an SCN
+    statement = ORA_ROWSCN_PATTERN.sub('total_changes()', statement)
+    return POSITIONAL_BIND_PATTERN.sub(r'?\1', statement)
+
+
+def oracle_sql_id(sql):
+    """Oracle's sql_id for a statement: base-32 of the low 64 bits of MD5(text + NUL)"""
+    digest = hashlib.md5(sql.encode() + b'\x00').digest()
+    _, _, msb, lsb = struct.unpack('<IIII', digest)
+    value = (msb << 32) | lsb
+    return ''.join(SQL_ID_ALPHABET[(value >> (5 * index)) & 31] for index in reversed(range(13)))
+
+
+def match_override(sql, overrides):
+    """Return the first override whose key appears in the SQL text"""
+    upper_sql = sql.upper()
+    for fragment, value in overrides.items():
+        if fragment.upper() in upper_sql:
+            return value
+    return None
+
+
+class FakeDatabase:
+    """One in-memory SQLite database standing in for an Oracle instance"""
+
+    def __init__(self, instance_type):
+        self.instance_type = instance_type
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(':memory:', check_same_thread=False)
+        self.db.create_function('ORACLE_TRUNC', 1, oracle_trunc)
+        self.db.create_function('ORACLE_TRUNC', 2, oracle_trunc)
+        self.seed()
+
+    def seed(self):
+        self.db.execute("""
+        CREATE TABLE employees (
+            employee_id    INTEGER,
+            first_name     TEXT,
+            last_name      TEXT,
+            salary         REAL,
+            hire_date      TEXT
+        )
+        """)
+        now = datetime.now().replace(microsecond=0)
+        rows = [
+            (employee_id, first_name, last_name, salary, (now - timedelta(days=days)).strftime(SQLITE_TIMESTAMP_FORMAT))
+            for employee_id, first_name, last_name, salary, days in SEED_EMPLOYEES[:FAKE_ORACLE_EMPLOYEES]
+        ]
+        # Deterministic synthetic rows beyond the seed data
+        rng = random.Random(FAKE_ORACLE_SEED)
+        first_names = [row[1] for row in SEED_EMPLOYEES]
+        last_names = [row[2] for row in SEED_EMPLOYEES]
+        for index in range(len(rows), FAKE_ORACLE_EMPLOYEES):
+            hire_date = now - timedelta(days=rng.randint(1, 3650))
+            rows.append((
+                10000 + index,
+                rng.choice(first_names),
+                rng.choice(last_names),
+                round(rng.uniform(40000, 150000), 2),
+                hire_date.strftime(SQLITE_TIMESTAMP_FORMAT)
+            ))
+        self.db.executemany("INSERT INTO employees VALUES (?, ?, ?, ?, ?)", rows)
+        self.db.execute("CREATE INDEX emp_salary_idx ON employees(salary)")
+        self.db.execute("CREATE INDEX emp_hire_date_idx ON employees(hire_date)")
+        # TABLE_VERSIONS as in create-schema.sql; SQLite triggers are row-level, which only bumps it more often
+        self.db.execute("CREATE TABLE table_versions (table_name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)")
+        self.db.execute("INSERT INTO table_versions (table_name) VALUES ('EMPLOYEES')")
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            self.db.execute(f"""
+            CREATE TRIGGER employees_version_{event.lower()} AFTER {event} ON employees
+            BEGIN
+                UPDATE table_versions SET version = version + 1 WHERE table_name = 'EMPLOYEES';
+            END
+            """)
+        self.db.commit()
+
+
+class FakeFetchInfo:
+    """Column metadata passed to output type handlers"""
+
+    def __init__(self, name):
+        self.name = name
+        self.type_code = None
+
+
+class FakeVar:
+    """Fetch variable returned by cursor.var(); only the outconverter is honoured"""
+
+    def __init__(self, fetch_type, outconverter=None):
+        self.type = fetch_type
+        self.outconverter = outconverter
+
+
+class FakeCursor:
+    """Cursor exposing the subset of the oracledb cursor API used by the API"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.description = None
+        self.rowcount = 0
+        self.load([])
+        self.outputtypehandler = None
+        self.rowfactory = None
+
+    def var(self, fetch_type, size=0, arraysize=1, outconverter=None, **kwargs):
+        return FakeVar(fetch_type, outconverter)
+
+    def execute(self, sql, params=None):
+        database = self.connection.database
+        # Like oracledb, a rowfactory applies to the statement it was set for
+        self.rowfactory = None
+        latency_ms = match_override(sql, FAKE_ORACLE_QUERY_LATENCY_MS)
+        latency_ms = FAKE_ORACLE_LATENCY_MS if latency_ms is None else latency_ms
+        self.round_trip(latency_ms)
+
+        # Plan capture queries answered from SQLite's query plan for the previous statement
+        if PLAN_LOOKUP_PATTERN.search(sql):
+            return self.plan_lookup()
+        if DISPLAY_CURSOR_PATTERN.search(sql):
+            return self.display_cursor(params)
+
+        statement = translate_sql(sql)
+        if statement is None:
+            self.description = None
+            self.load([])
+            return self
+
+        binds = [value.strftime(SQLITE_TIMESTAMP_FORMAT) if isinstance(value, datetime) else value
+                 for value in (params or [])]
+        with database.lock:
+            cursor = database.db.execute(statement, binds)
+            rows = cursor.fetchall() if cursor.description else []
+            self.rowcount = len(rows) if cursor.description else cursor.rowcount
+        self.connection.previous_statement = (sql, statement, binds)
+
+        if cursor.description:
+            # Oracle reports unquoted identifiers in upper case
+            self.description = [(column[0].upper(),) + tuple(column[1:]) for column in cursor.description]
+            row_count = match_override(sql, FAKE_ORACLE_QUERY_ROWS)
+            if row_count is not None and rows:
+                rows = list(islice(cycle(rows), int(row_count)))
+            self.load(self.fetch_converter()([self.convert_row(row) for row in rows]))
+        else:
+            self.description = None
+            self.load([])
+        return self
+
+    def load(self, rows):
+        """Result of the statement just executed; the execute round trip carries prefetchrows of it"""
+        self.result = rows
+        self.position = 0
+        self.buffered = min(self.prefetchrows, len(rows))
+        # Fewer rows than requested tells the driver the result has ended
+        self.end_seen = len(rows) < self.prefetchrows
+        self.round_trips = 0
+
+    def round_trip(self, latency_ms):
+        """Simulated server time, cut short by the connection's call timeout like the driver does"""
+        call_timeout = self.connection.call_timeout
+        if call_timeout and latency_ms > call_timeout:
+            time.sleep(call_timeout / 1000.0)
+            raise TimeoutError(f"DPY-4024: call timeout of {call_timeout} ms exceeded")
+        if latency_ms:
+            time.sleep(latency_ms / 1000.0)
+
+    def fetch_round_trip(self):
+        self.round_trip(FAKE_ORACLE_ROUND_TRIP_MS)
+        fetched = min(self.arraysize, len(self.result) - self.buffered)
+        self.buffered += fetched
+        self.round_trips += 1
+        if fetched < self.arraysize:
+            self.end_seen = True
+
+    def take(self, count=None):
+        """Up to count rows (all when None), making fetch round trips as the driver would"""
+        while not self.end_seen and (count is None or self.position + count > self.buffered):
+            self.fetch_round_trip()
+        end = self.buffered if count is None else min(self.position + count, self.buffered)
+        rows = self.result[self.position:end]
+        self.position = end
+        if self.rowfactory is not None:
+            return [self.rowfactory(*row) for row in rows]
+        return rows
+
+    def fetch_converter(self):
+        """Apply the outconverters an output type handler requested, like the driver does while fetching"""
+        if self.outputtypehandler is None:
+            return lambda rows: rows
+        converters = []
+        for index, column in enumerate(self.description):
+            fetch_var = self.outputtypehandler(self, FakeFetchInfo(column[0]))
+            if fetch_var is not None and fetch_var.outconverter is not None:
+                converters.append((index, fetch_var.outconverter))
+        if not converters:
+            return lambda rows: rows
+
+        def convert(rows):
+            converted = []
+            for row in rows:
+                row = list(row)
+                for index, converter in converters:
+                    if row[index] is not None:
+                        row[index] = converter(row[index])
+                converted.append(tuple(row))
+            return converted
+        return convert
+
+    def set_result(self, columns, rows):
+        self.description = [(column,) for column in columns]
+        self.load(rows)
+        return self
+
+    def plan_lookup(self):
+        """prev_sql_id, prev_child_number, plan_hash_value of the previous statement"""
+        previous = self.connection.previous_statement
+        if previous is None:
+            return self.set_result(['PREV_SQL_ID', 'PREV_CHILD_NUMBER', 'PLAN_HASH_VALUE'], [])
+        sql, statement, binds = previous
+        with self.connection.database.lock:
+            steps = [row[3] for row in self.connection.database.db.execute(f"EXPLAIN QUERY PLAN {statement}", binds)]
+        sql_id = oracle_sql_id(sql)
+        self.connection.previous_plan = (sql_id, steps)
+        return self.set_result(['PREV_SQL_ID', 'PREV_CHILD_NUMBER', 'PLAN_HASH_VALUE'],
+                               [(sql_id, 0, zlib.crc32('\n'.join(steps).encode()))])
+
+    def display_cursor(self, params):
+        sql_id = params[0] if params else None
+        steps = []
+        if self.connection.previous_plan and self.connection.previous_plan[0] == sql_id:
+            steps = self.connection.previous_plan[1]
+        lines = [f"SQL_ID  {sql_id}, child number 0", "", "SQLite query plan:"] + [f"  {step}" for step in steps]
+        return self.set_result(['PLAN_TABLE_OUTPUT'], [(line,) for line in lines])
+
+    @staticmethod
+    def convert_row(row):
+        """Restore DATE columns, which SQLite stores as text, to datetime like oracledb returns"""
+        return tuple(
+            datetime.strptime(value, SQLITE_TIMESTAMP_FORMAT)
+            if isinstance(value, str) and TIMESTAMP_PATTERN.match(value) else value
+            for value in row
+        )
+
+    def fetchone(self):
+        rows = self.take(1)
+        return rows[0] if rows else None
+
+    def fetchmany(self, size=None):
+        return self.take(size or self.arraysize)
+
+    def fetchall(self):
+        return self.take()
+
+    def __iter__(self):
+        while True:
+            rows = self.take(self.arraysize)
+            if not rows:
+                return
+            yield from rows
+
+    def close(self):
+        self.load([])
+
+
+class FakeConnection:
+    """Connection exposing the subset of the oracledb connection API used by the API"""
+
+    def __init__(self, database):
+        self.database = database
+        # Set while checked out of a FakePool; close() then returns it to the pool
+        self.pool = None
+        # (original SQL, SQLite statement, binds) of the last statement, for plan capture
+        self.previous_statement = None
+        self.previous_plan = None
+        # Milliseconds each round trip may take (0 = no limit), as oracledb's call_timeout
+        self.call_timeout = 0
+        # v$session CLIENT_INFO / CLIENT_IDENTIFIER, as oracledb's write-only attributes
+        self.clientinfo = None
+        self.client_identifier = None
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        with self.database.lock:
+            self.database.db.commit()
+
+    def rollback(self):
+        with self.database.lock:
+            self.database.db.rollback()
+
+    def ping(self):
+        return None
+
+    def close(self):
+        if self.pool is not None:
+            pool, self.pool = self.pool, None
+            pool.release(self)
+
+
+class FakePool:
+    """Connection pool with the subset of the oracledb pool API used by the API (timed-wait getmode)"""
+
+    def __init__(self, connect, maximum, wait_timeout_ms, session_callback=None):
+        self.connect = connect
+        self.max = maximum
+        self.wait_timeout_ms = wait_timeout_ms
+        self.session_callback = session_callback
+        self.condition = threading.Condition()
+        self.idle = []
+        self.opened = 0
+        self.busy = 0
+
+    def acquire(self):
+        deadline = time.monotonic() + self.wait_timeout_ms / 1000.0
+        with self.condition:
+            while not self.idle and self.opened >= self.max:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"timed out waiting for a pooled connection ({self.max} busy)")
+                self.condition.wait(remaining)
+            self.busy += 1
+            if self.idle:
+                connection = self.idle.pop()
+                connection.pool = self
+                return connection
+            # Reserve the slot, then connect outside the lock
+            self.opened += 1
+        try:
+            connection = self.connect()
+            if self.session_callback is not None:
+                self.session_callback(connection, None)
+        except Exception:
+            with self.condition:
+                self.opened -= 1
+                self.busy -= 1
+                self.condition.notify()
+            raise
+        connection.pool = self
+        return connection
+
+    def release(self, connection):
+        with self.condition:
+            self.busy -= 1
+            self.idle.append(connection)
+            self.condition.notify()
+
+
+class FakeOracleBackend:
+    """In-process stand-in for the three Oracle instances"""
+    name = "fake"
+
+    def __init__(self):
+        self.databases = {}
+        self.lock = threading.Lock()
+
+    def connect(self, instance_type, instance_config, user, password, sid):
+        if FAKE_ORACLE_CONNECT_LATENCY_MS:
+            time.sleep(FAKE_ORACLE_CONNECT_LATENCY_MS / 1000.0)
+        with self.lock:
+            if instance_type not in self.databases:
+                self.databases[instance_type] = FakeDatabase(instance_type)
+        return FakeConnection(self.databases[instance_type])
+
+    def create_pool(self, instance_type, instance_config, user, password, sid, minimum, maximum,
+                    wait_timeout_ms, session_callback=None):
+        return FakePool(lambda: self.connect(instance_type, instance_config, user, password, sid),
+                        maximum, wait_timeout_ms, session_callback)
+
+
+BACKENDS = {
+    'oracle': OracleBackend,
+    'fake': FakeOracleBackend,
+}
+
+
+def create_backend(name=ORACLE_BACKEND):
+    """Instantiate the configured backend"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown ORACLE_BACKEND '{name}' (expected one of: {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
@@ -0,0 +1,126 @@
+"""Conditional GET support for the Oracle Demo API
+
+Read endpoints send a weak ETag derived from the version of the table they read on the
+instance that served them; a request whose If-None-Match already carries it gets a 304
+without the query running or rows being serialized. Versions come from API_ETAG_VERSION:
+
+    table              the table's row in TABLE_VERSIONS, bumped by a statement-level trigger on
+                       every insert, update and delete. One unique lookup (a single block of an
+                       index-organized table) on the served connection, whatever the table's size.
+                       Sees every writer and every API worker. Default.
+    rowscn             SELECT MAX(ORA_ROWSCN) probe - needs no schema objects, but it is a full
+                       scan of the table on every request. ORA_ROWSCN is block-level, so a tag
+                       may change without the rows changing.
+    counter            change counter per instance and table, bumped by the API's own writes.
+                       No database round trip, but blind to other writers (other workers,
+                       scripts, SQL*Plus), so its tags also expire every API_ETAG_MAX_AGE
+                       seconds - the longest a client can be told stale data is unchanged.
+    off                no ETags
+"""
+import os
+import threading
+import time
+import uuid
+
+from fastapi.responses import Response
+
+from timing import phase
+
+API_ETAG_VERSION = os.getenv("API_ETAG_VERSION", "table").lower()
+# Lifetime of counter-based versions, in seconds
+API_ETAG_MAX_AGE = float(os.getenv("API_ETAG_MAX_AGE", "30"))
+
+VERSION_TABLE_PROBE_SQL = "SELECT version FROM table_versions WHERE table_name = :1"
+ROWSCN_PROBE_SQL = "SELECT MAX(ORA_ROWSCN) FROM {table}"
+# Set once the schema turns out to have no TABLE_VERSIONS, instead of failing every read
+version_table_missing = False
+
+
+class TableVersions:
+    """Per-instance, per-table change counters"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        # Counters restart with the process, so a restart must not reuse old tags
+        self.epoch = uuid.uuid4().hex[:8]
+
+    def bump(self, instance_type, table):
+        with self.lock:
+            key = (instance_type, table)
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def version(self, instance_type, table):
+        # Writes this process can't see are picked up once the age window rolls over
+        window = int(time.time() // API_ETAG_MAX_AGE)
+        with self.lock:
+            return f"{self.epoch}.{window}.{self.counters.get((instance_type, table), 0)}"
+
+
+table_versions = TableVersions()
+
+
+def table_changed(instance_type, table):
+    """Record a committed write to table on instance_type"""
+    table_versions.bump(instance_type, table)
+
+
+def needs_probe():
+    return API_ETAG_VERSION == "rowscn" or (API_ETAG_VERSION == "table" and not version_table_missing)
+
+
+def version_table_probe(cursor, table):
+    """The table's TABLE_VERSIONS version, or None when it has no row or the table is missing"""
+    global version_table_missing
+    try:
+        with phase("version_probe"):
+            cursor.execute(VERSION_TABLE_PROBE_SQL, [table.upper()])
+            row = cursor.fetchone()
+    except Exception as e:
+        if "ORA-00942" not in str(e):
+            raise
+        print(f"Warning: ETags disabled, API_ETAG_VERSION=table needs TABLE_VERSIONS (see create-schema.sql): {e}")
+        version_table_missing = True
+        return None
+    # No row means no trigger keeps it current - a fixed tag would 304 forever
+    return row[0] if row else None
+
+
+def table_etag(endpoint, instance_type, table, cursor=None):
+    """Weak ETag for endpoint's view of table, or None when disabled or a probe cursor is needed"""
+    if API_ETAG_VERSION == "counter":
+        version = table_versions.version(instance_type, table)
+    elif API_ETAG_VERSION == "table" and cursor is not None and not version_table_missing:
+        row_version = version_table_probe(cursor, table)
+        if row_version is None:
+            return None
+        version = f"v{row_version}"
+    elif API_ETAG_VERSION == "rowscn" and cursor is not None:
+        with phase("version_probe"):
+            cursor.execute(ROWSCN_PROBE_SQL.format(table=table))
+            row = cursor.fetchone()
+        version = f"scn{row[0] if row and row[0] is not None else 0}"
+    else:
+        return None
+    # Weak: responses also carry per-request correlation fields, only the data is identical
+    return f'W/"{endpoint.strip("/").replace("/", ".")}-{instance_type}-{version}"'
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an If-None-Match header against etag"""
+    if not if_none_match or etag is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def not_modified(etag):
+    return Response(status_code=304, headers={"ETag": etag})
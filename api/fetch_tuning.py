@@ -0,0 +1,157 @@
+"""Adaptive fetch sizing for the Oracle Demo API
+
+Every cursor used to fetch with the driver defaults (prefetchrows=2, arraysize=100), whatever
+the query returns. The tuner records how many rows each query shape (endpoint) returned on
+recent executions and sizes the next execution from that:
+
+    prefetchrows    expected rows + 1, so a result of the usual size comes back whole in
+                    the execute round trip and the driver sees its end without another trip
+    arraysize       the same, never below the driver default, so scans come back in as few
+                    large batches as the memory cap allows and a surprise result stays cheap
+
+Expected rows are the largest count in the recent window plus FETCH_HEADROOM. The memory cap
+(API_FETCH_MAX_BYTES) bounds the rows buffered per round trip, using the column sizes in
+cursor.description. Fetch round trips per execution are exported as the
+api.db.fetch.round_trips.estimated histogram. The driver has no per-cursor round-trip counter,
+so they are estimated from the row count and the fetch sizes set, assuming the driver honours
+them - an estimate, not an observation.
+
+API_FETCH_TUNING=adaptive (default) tunes, =off leaves the driver defaults.
+"""
+import os
+import threading
+from collections import deque
+
+from opentelemetry import metrics, trace
+
+API_FETCH_TUNING = os.getenv("API_FETCH_TUNING", "adaptive").lower()
+# Rows buffered per round trip are capped at this many bytes
+API_FETCH_MAX_BYTES = int(os.getenv("API_FETCH_MAX_BYTES", str(8 * 1024 * 1024)))
+API_FETCH_WINDOW = int(os.getenv("API_FETCH_WINDOW", "20"))
+
+# Driver defaults, used until a shape has been seen
+DEFAULT_PREFETCH_ROWS = 2
+DEFAULT_ARRAYSIZE = 100
+# Growth allowed for before a result needs an extra round trip
+FETCH_HEADROOM = 1.25
+# Assumed width of columns the driver reports no size for (NUMBER, DATE)
+DEFAULT_COLUMN_BYTES = 22
+
+# Proxy instrument - becomes live once the API's MeterProvider is installed
+fetch_round_trips_histogram = metrics.get_meter("oracle-api").create_histogram(
+    "api.db.fetch.round_trips.estimated", unit="{round_trip}",
+    description="Fetch round trips after execute per query, estimated from rows and fetch sizes")
+
+
+def fetch_round_trips(rows, prefetchrows, arraysize):
+    """Estimated round trips after the execute to fetch rows: batches of arraysize until one comes back short"""
+    if rows < prefetchrows:
+        return 0
+    return (rows - prefetchrows) // arraysize + 1
+
+
+def row_bytes(description):
+    """Estimated buffer size of one row from the cursor's column sizes"""
+    total = 0
+    for column in description or ():
+        internal_size = column[3] if len(column) > 3 else None
+        total += internal_size if isinstance(internal_size, int) and internal_size > 0 else DEFAULT_COLUMN_BYTES
+    return max(total, 1)
+
+
+def fetch_sizes(expected_rows, bytes_per_row):
+    """(prefetchrows, arraysize) for a result of about expected_rows rows"""
+    cap_rows = max(1, API_FETCH_MAX_BYTES // bytes_per_row)
+    rows = min(expected_rows + 1, cap_rows)
+    return rows, min(max(rows, DEFAULT_ARRAYSIZE), cap_rows)
+
+
+class QueryShape:
+    """Recent row counts of one query shape and the fetch sizes chosen from them"""
+    __slots__ = ("row_counts", "bytes_per_row", "prefetchrows", "arraysize")
+
+    def __init__(self):
+        self.row_counts = deque(maxlen=API_FETCH_WINDOW)
+        self.bytes_per_row = None
+        self.prefetchrows = DEFAULT_PREFETCH_ROWS
+        self.arraysize = DEFAULT_ARRAYSIZE
+
+
+class FetchTuner:
+    """Chooses prefetchrows/arraysize per query shape from the row counts it returned"""
+
+    def __init__(self, mode=API_FETCH_TUNING):
+        self.mode = mode
+        self.lock = threading.Lock()
+        self.shapes = {}
+
+    def tune(self, cursor, shape):
+        """Set the cursor's fetch sizes for shape; call before executing the query"""
+        if self.mode == "off":
+            return
+        with self.lock:
+            state = self.shapes.get(shape)
+            if state is None:
+                return
+            cursor.prefetchrows = state.prefetchrows
+            cursor.arraysize = state.arraysize
+
+    def record(self, cursor, shape, rows):
+        """Record the rows the query just fetched on cursor returned and size the next execution"""
+        prefetchrows, arraysize = cursor.prefetchrows, cursor.arraysize
+        round_trips = fetch_round_trips(rows, prefetchrows, arraysize)
+        fetch_round_trips_histogram.record(round_trips, {"http.route": shape})
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.set_attribute("db.fetch.prefetchrows", prefetchrows)
+            span.set_attribute("db.fetch.arraysize", arraysize)
+            span.set_attribute("db.fetch.round_trips.estimated", round_trips)
+        if self.mode == "off":
+            return
+
+        with self.lock:
+            state = self.shapes.get(shape)
+            if state is None:
+                state = self.shapes[shape] = QueryShape()
+            state.row_counts.append(rows)
+            if state.bytes_per_row is None:
+                state.bytes_per_row = row_bytes(cursor.description)
+            expected_rows = int(max(state.row_counts) * FETCH_HEADROOM)
+            state.prefetchrows, state.arraysize = fetch_sizes(expected_rows, state.bytes_per_row)
+
+    def recent_rows(self, shape):
+        """Largest row count shape returned in the recent window, or None before its first record"""
+        with self.lock:
+            state = self.shapes.get(shape)
+            return max(state.row_counts) if state is not None else None
+
+    def profiles(self):
+        with self.lock:
+            return {
+                shape: {
+                    "prefetchrows": state.prefetchrows,
+                    "arraysize": state.arraysize,
+                    "max_recent_rows": max(state.row_counts),
+                    "bytes_per_row": state.bytes_per_row
+                }
+                for shape, state in self.shapes.items()
+            }
+
+
+fetch_tuner = FetchTuner()
+
+
+def tune_fetch(cursor, shape):
+    fetch_tuner.tune(cursor, shape)
+
+
+def record_fetch(cursor, shape, rows):
+    fetch_tuner.record(cursor, shape, rows)
+
+
+def recent_rows(shape):
+    return fetch_tuner.recent_rows(shape)
+
+
+def fetch_profiles():
+    return fetch_tuner.profiles()
@@ -1,43 +1,68 @@
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-import oracledb
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+import anyio
 import os
 import random
+import socket
 from datetime import datetime, timedelta
 from typing import List, Dict
 import json
+import threading
 import time
 
 # OpenTelemetry imports
 from opentelemetry import trace
 from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 from opentelemetry.instrumentation.requests import RequestsInstrumentor
 from opentelemetry.sdk.resources import Resource
 # OpenTelemetry propagation handled by FastAPI instrumentation
 
+from backends import create_backend
+from tracing import CountingBatchSpanProcessor, build_sampler, otlp_span_exporter
+from timing import ServerTimingMiddleware, phase
+from plans import capture_plan, cached_plans
+from fetch_tuning import fetch_profiles, recent_rows, record_fetch, tune_fetch
+from serialization import FastJSONResponse, dict_rows, json_bytes
+from queries import API_STREAM_MIN_ROWS, QUERIES
+from etags import etag_matches, needs_probe, not_modified, table_changed, table_etag
+from pools import PoolManager
+from metrics import (RequestMetricsMiddleware, init_metrics, note_instance, note_rows, note_bytes,
+                     connection_acquired, connection_released, render_prometheus, use_pool_stats)
+
 # Configure OpenTelemetry
+# One instance per worker process, so the collector keeps each worker's cumulative series apart
 resource = Resource.create({
     "service.name": "oracle-api",
     "service.version": "1.0.0",
+    "service.instance.id": f"{socket.gethostname()}-{os.getpid()}",
 })
 
-trace.set_tracer_provider(TracerProvider(resource=resource))
+# Head sampling (ratio, parent-based, per-endpoint overrides) - see tracing.py
+trace.set_tracer_provider(TracerProvider(resource=resource, sampler=build_sampler()))
 tracer = trace.get_tracer(__name__)
 
-# Configure OTLP exporter to send to OTEL collector
-otlp_exporter = OTLPSpanExporter(
-    endpoint="http://otel-collector:4317",
-    insecure=True
-)
+# Configure OTLP exporter to send to OTEL collector (OTEL_TRACES_EXPORTER=none disables export)
+OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://otel-collector:4317")
+OTEL_TRACES_EXPORTER = os.getenv("OTEL_TRACES_EXPORTER", "otlp").lower()
+
+if OTEL_TRACES_EXPORTER != "none":
+    # Created on the export thread at the first batch, so gRPC setup doesn't hold up boot
+    otlp_exporter = otlp_span_exporter(OTEL_EXPORTER_OTLP_ENDPOINT)
 
-span_processor = BatchSpanProcessor(otlp_exporter)
-trace.get_tracer_provider().add_span_processor(span_processor)
+    # Queue size, batch size and export interval come from OTEL_BSP_*; drops are counted
+    span_processor = CountingBatchSpanProcessor(otlp_exporter)
+    trace.get_tracer_provider().add_span_processor(span_processor)
 
 app = FastAPI(title="Oracle Demo API", description="API for triggering Oracle queries from frontend")
 
+@app.on_event("startup")
+def warm_connection_pools():
+    """Open each worker's minimum sessions in the background; /health reports ready when done"""
+    connection_pools.warm_in_background()
+
 # Instrument FastAPI with OpenTelemetry
 FastAPIInstrumentor.instrument_app(app)
 RequestsInstrumentor().instrument()
@@ -51,11 +76,61 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request phase timing as span events and a Server-Timing response header
+app.add_middleware(ServerTimingMiddleware)
+
+# API-side latency, in-flight, connection, payload and error metrics
+app.add_middleware(RequestMetricsMiddleware, route_paths=lambda: [route.path for route in app.routes])
+
+# Optional request capture in the load generator's replay format (one JSON line per request)
+API_CAPTURE_FILE = os.getenv("API_CAPTURE_FILE", "")
+CAPTURED_HEADERS = (
+    "traceparent", "tracestate", "x-correlation-id", "x-user-action",
+    "x-database-operation", "x-target-instance", "x-workload-category", "content-type"
+)
+
+if API_CAPTURE_FILE:
+    # O_APPEND keeps single-write lines intact across uvicorn workers
+    capture_fd = os.open(API_CAPTURE_FILE, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    @app.middleware("http")
+    async def capture_requests(request: Request, call_next):
+        """Record method, path, correlation headers, body and timing for later replay"""
+        body = await request.body()
+        start_time = time.time()
+        response = await call_next(request)
+        duration = time.time() - start_time
+
+        try:
+            body_json = json.loads(body) if body else None
+        except ValueError:
+            body_json = None
+
+        path = request.url.path + (f"?{request.url.query}" if request.url.query else "")
+        line = json.dumps({
+            "ts": round(start_time, 6),
+            "method": request.method,
+            "path": path,
+            "headers": {name: request.headers[name] for name in CAPTURED_HEADERS if name in request.headers},
+            "body": body_json,
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "source": "api"
+        }, separators=(",", ":"))
+        os.write(capture_fd, (line + "\n").encode())
+        return response
+
 # Oracle connection settings - Multi-instance support
 ORACLE_USER = os.getenv("ORACLE_USER", "testuser")
 ORACLE_PASSWORD = os.getenv("ORACLE_PASSWORD", "testpass")
 ORACLE_SID = os.getenv("ORACLE_SID", "XEPDB1")
 
+# Database backend (ORACLE_BACKEND=oracle|fake) - see backends.py
+backend = create_backend()
+
+# Pause after each correlated query so the OTEL collector can capture the correlation data
+ORACLE_CORRELATION_DELAY_SECONDS = float(os.getenv("ORACLE_CORRELATION_DELAY_SECONDS", "1"))
+
 # Multi-instance Oracle configuration for production-like environment
 ORACLE_INSTANCES = {
     'primary': {
@@ -84,14 +159,12 @@ ORACLE_INSTANCES = {
     }
 }
 
-def get_oracle_connection(instance_type='primary'):
-    """Get Oracle database connection for specified instance"""
-    try:
-        instance_config = ORACLE_INSTANCES.get(instance_type, ORACLE_INSTANCES['primary'])
-        conn_str = f"{ORACLE_USER}/{ORACLE_PASSWORD}@{instance_config['host']}:{instance_config['port']}/{ORACLE_SID}"
-        connection = oracledb.connect(conn_str, mode=oracledb.DEFAULT_AUTH)
-        
-        # Set session parameters based on workload type
+# Metrics served on /metrics and pushed over OTLP (see metrics.py)
+init_metrics(resource, ORACLE_INSTANCES.keys(), OTEL_EXPORTER_OTLP_ENDPOINT)
+
+def configure_session(connection, instance_config):
+    """Session parameters for the instance's workload type, set once per pooled session"""
+    with phase("session_setup"):
         cursor = connection.cursor()
         if instance_config['workload_type'] == 'OLTP':
             cursor.execute("ALTER SESSION SET OPTIMIZER_MODE = FIRST_ROWS")
@@ -103,10 +176,41 @@ def get_oracle_connection(instance_type='primary'):
             cursor.execute("ALTER SESSION SET HASH_AREA_SIZE = 33554432")  # 32MB for reporting
         
         cursor.close()
+
+# Per-worker pools holding each worker's share of max_connections (see pools.py)
+connection_pools = PoolManager(backend, ORACLE_INSTANCES, ORACLE_USER, ORACLE_PASSWORD, ORACLE_SID, configure_session)
+use_pool_stats(connection_pools.stats)
+
+def get_oracle_connection(instance_type='primary'):
+    """Get Oracle database connection for specified instance from its pool"""
+    try:
+        if instance_type not in ORACLE_INSTANCES:
+            instance_type = 'primary'
+        note_instance(instance_type)
+        connect_start = time.perf_counter()
+        # New sessions run configure_session inside the acquire
+        with phase("connect"):
+            connection = connection_pools.acquire(instance_type)
+        connection_acquired(instance_type, time.perf_counter() - connect_start)
         return connection
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database connection failed for {instance_type}: {str(e)}")
 
+def release_oracle_connection(instance_type, connection, cursor=None):
+    """Close the cursor and release the connection obtained from get_oracle_connection to its pool"""
+    try:
+        if cursor is not None:
+            cursor.close()
+        # Pooled sessions keep their call timeout - clear a query's before the next borrower
+        connection.call_timeout = 0
+        # and the correlation context a sampled request set, so later (unsampled) requests don't
+        # run under its trace in v$session. The driver sends these with the next round trip.
+        connection.clientinfo = ""
+        connection.client_identifier = ""
+        connection.close()
+    finally:
+        connection_released(instance_type)
+
 def select_instance_for_workload(workload_type='OLTP'):
     """Select optimal Oracle instance based on workload type"""
     workload_mapping = {
@@ -145,326 +249,381 @@ def extract_correlation_from_request(request: Request):
     user_action = request.headers.get("x-user-action", "unknown")
     
     # Set correlation_id as span attribute for APM visibility
-    if current_span:
+    if current_span.is_recording():
         current_span.set_attribute("correlation_id", correlation_id)
         current_span.set_attribute("user_action", user_action)
         current_span.set_attribute("observability.correlation_source", "rum_trace_context" if current_span.get_span_context().trace_id != 0 else "fallback")
     
     return correlation_id, user_action
 
+def sql_correlation_comment(correlation_id, user_action):
+    """SQL comment carrying the trace context for the collector's correlation logs
+    
+    Unsampled requests get no comment, so their SQL text stays constant and reuses one shared cursor.
+    """
+    current_span = trace.get_current_span()
+    if not current_span.is_recording():
+        return ""
+    span_context = current_span.get_span_context()
+    trace_id = format(span_context.trace_id, '032x')
+    span_id = format(span_context.span_id, '016x')
+    return f"/* correlation_id={correlation_id} user_action={user_action} otel_trace_id={trace_id} otel_span_id={span_id} */"
+
+def execute_sql(cursor, sql, params=None):
+    with phase("execute"):
+        if params:
+            cursor.execute(sql, params)
+        else:
+            cursor.execute(sql)
+    return cursor
+
 def execute_with_correlation(cursor, sql, correlation_id, user_action=None, params=None):
     """Execute SQL with Oracle-native correlation context using CLIENT_INFO for production correlation"""
+    # Unsampled requests have no trace to correlate with - skip the PL/SQL round trips and delay
+    current_span = trace.get_current_span()
+    if not current_span.is_recording():
+        return execute_sql(cursor, sql, params)
+    
     try:
         # Get current OpenTelemetry trace context
-        current_span = trace.get_current_span()
-        trace_id = "unknown"
-        span_id = "unknown"
-        
-        if current_span and current_span.get_span_context().trace_id != 0:
-            trace_id = format(current_span.get_span_context().trace_id, '032x')[:16]  # Truncate for Oracle
-            span_id = format(current_span.get_span_context().span_id, '016x')
+        span_context = current_span.get_span_context()
+        trace_id = format(span_context.trace_id, '032x')[:16]  # Truncate for Oracle
+        span_id = format(span_context.span_id, '016x')
         
         # Set Oracle CLIENT_INFO with OpenTelemetry trace context (most reliable method)
         client_info = f"otel_trace={trace_id},otel_span={span_id},correlation={correlation_id},user_action={user_action or 'unknown'}"
-        cursor.execute("BEGIN DBMS_APPLICATION_INFO.SET_CLIENT_INFO(:1); END;", [client_info])
+        with phase("client_info"):
+            cursor.execute("BEGIN DBMS_APPLICATION_INFO.SET_CLIENT_INFO(:1); END;", [client_info])
         
         # Set Oracle client identifier as backup correlation method
-        cursor.execute("BEGIN DBMS_SESSION.SET_IDENTIFIER(:1); END;", [correlation_id])
-        
-        # Execute the actual SQL
-        if params:
-            cursor.execute(sql, params)
-        else:
-            cursor.execute(sql)
-        
-        # Brief sleep to allow OTEL collector to capture correlation data
-        time.sleep(1)
-            
-        return cursor
+        with phase("client_identifier"):
+            cursor.execute("BEGIN DBMS_SESSION.SET_IDENTIFIER(:1); END;", [correlation_id])
     except Exception as e:
-        # If context setting fails, still try to execute the SQL
+        # If context setting fails, still execute the SQL - uncorrelated
         print(f"Warning: Failed to set Oracle context: {e}")
-        if params:
-            cursor.execute(sql, params)
-        else:
-            cursor.execute(sql)
-        return cursor
-
-@app.get("/")
-async def root():
-    return {"message": "Oracle Demo API - Ready to trigger database queries!"}
-
-@app.get("/api/employees")
-async def get_employees(request: Request):
-    """Get employees list - triggers SELECT with explain plan using Oracle-native correlation"""
-    # Extract correlation ID from RUM trace context
-    correlation_id, user_action = extract_correlation_from_request(request)
+        return execute_sql(cursor, sql, params)
     
-    # Add additional span attributes for this endpoint
-    current_span = trace.get_current_span()
-    if current_span:
-        current_span.set_attribute("observability.layer", "api")
-        current_span.set_attribute("database.operation", "select")
-        current_span.set_attribute("oracle.native_correlation", True)
-        current_span.set_attribute("api.endpoint", "/api/employees")
-        current_span.set_attribute("api.method", "GET")
+    # Execute the actual SQL - its own errors propagate rather than running it a second time
+    execute_sql(cursor, sql, params)
     
-    # Route to appropriate Oracle instance based on workload
-    instance_type = select_instance_for_workload('OLTP')
-    connection = get_oracle_connection(instance_type)
-    cursor = connection.cursor()
-    
-    # Add instance information to span
-    if current_span:
-        current_span.set_attribute("database.instance.type", instance_type)
-        current_span.set_attribute("database.instance.config", ORACLE_INSTANCES[instance_type]['service'])
-    
-    try:
-        # Get OpenTelemetry trace context for embedding in SQL
-        current_span = trace.get_current_span()
-        trace_id = "unknown"
-        span_id = "unknown"
-        
-        if current_span and current_span.get_span_context().trace_id != 0:
-            trace_id = format(current_span.get_span_context().trace_id, '032x')
-            span_id = format(current_span.get_span_context().span_id, '016x')
-        
-        # SQL with embedded OpenTelemetry trace context and correlation ID
-        query = f"""
-        SELECT /*+ FULL(e) */ /* correlation_id={correlation_id} user_action={user_action} otel_trace_id={trace_id} otel_span_id={span_id} */
-            employee_id, 
-            first_name, 
-            last_name, 
-            salary, 
-            hire_date 
-        FROM employees e 
-        ORDER BY salary DESC
-        """
-        
-        # Execute with Oracle-native correlation context
-        execute_with_correlation(cursor, query, correlation_id, user_action)
-        columns = [desc[0] for desc in cursor.description]
-        rows = cursor.fetchall()
-        
-        employees = []
-        for row in rows:
-            employee = dict(zip(columns, row))
-            # Convert datetime to string for JSON serialization
-            if employee.get('HIRE_DATE'):
-                employee['HIRE_DATE'] = employee['HIRE_DATE'].isoformat()
-            employees.append(employee)
-        
-        # Add correlation tracking to response
-        result = {
-            "query_type": "employees_list",
-            "explain_plan_hint": "FULL table scan with ORDER BY",
-            "count": len(employees),
-            "employees": employees,
-            "correlation_id": correlation_id,
-            "observability": {
-                "user_action": user_action,
-                "sql_executed": True,
-                "table": "employees",
-                "oracle_native_correlation": True,
-                "correlation_method": "DBMS_SESSION.SET_IDENTIFIER"
-            }
-        }
+    # Brief sleep to allow OTEL collector to capture correlation data
+    if ORACLE_CORRELATION_DELAY_SECONDS:
+        with phase("correlation_delay"):
+            time.sleep(ORACLE_CORRELATION_DELAY_SECONDS)
         
-        # Add response details to span
-        if current_span:
-            current_span.set_attribute("response.record_count", len(employees))
-            current_span.set_attribute("database.table", "employees")
-        
-        return result
-    
-    finally:
-        cursor.close()
-        connection.close()
+    return cursor
 
-@app.get("/api/employees/high-salary")
-async def get_high_salary_employees(request: Request):
-    """Get high salary employees - triggers INDEX scan with Oracle-native correlation"""
-    # Extract correlation ID from RUM trace context
-    correlation_id, user_action = extract_correlation_from_request(request)
-    if user_action == "unknown":
-        user_action = "high-salary"
-        # Update the span attribute since we refined the user_action
-        current_span = trace.get_current_span()
-        if current_span:
-            current_span.set_attribute("user_action", user_action)
+def encode_response(result, etag=None):
+    """Serialize a response body straight to JSON bytes inside the encode phase"""
+    with phase("encode"):
+        response = FastJSONResponse(content=result)
+    if etag is not None:
+        response.headers["ETag"] = etag
+    note_bytes(len(response.body))
+    return response
+
+def check_not_modified(request, endpoint, instance_type, table, cursor=None):
+    """ETag for the data endpoint serves from table, plus the 304 to return if the client has it already
     
-    # Add additional span attributes for this endpoint
+    The version is read before the query runs, so a write racing the query can only cost the
+    client a refetch, never a stale 304.
+    """
+    etag = table_etag(endpoint, instance_type, table, cursor)
+    if not etag_matches(request.headers.get("if-none-match"), etag):
+        return etag, None
     current_span = trace.get_current_span()
-    if current_span:
-        current_span.set_attribute("observability.layer", "api")
-        current_span.set_attribute("database.operation", "select")
-        current_span.set_attribute("oracle.native_correlation", True)
-        current_span.set_attribute("api.endpoint", "/api/employees/high-salary")
-        current_span.set_attribute("api.method", "GET")
-    
-    # Route to primary instance for transactional queries
-    instance_type = select_instance_for_workload('high-salary')
-    connection = get_oracle_connection(instance_type)
-    cursor = connection.cursor()
-    
-    # Add instance information to span
-    if current_span:
-        current_span.set_attribute("database.instance.type", instance_type)
-        current_span.set_attribute("database.instance.config", ORACLE_INSTANCES[instance_type]['service'])
-    
-    try:
-        # Get OpenTelemetry trace context for embedding in SQL
-        current_span_for_sql = trace.get_current_span()
-        trace_id = "unknown"
-        span_id = "unknown"
-        
-        if current_span_for_sql and current_span_for_sql.get_span_context().trace_id != 0:
-            trace_id = format(current_span_for_sql.get_span_context().trace_id, '032x')
-            span_id = format(current_span_for_sql.get_span_context().span_id, '016x')
-        
-        # SQL with embedded OpenTelemetry trace context and correlation ID
-        query = f"""
-        SELECT /*+ INDEX_RS_ASC(e emp_salary_idx) */ /* correlation_id={correlation_id} user_action={user_action} otel_trace_id={trace_id} otel_span_id={span_id} */
-            employee_id, 
-            first_name, 
-            last_name, 
-            salary 
-        FROM employees e 
-        WHERE salary > 60000 
-        ORDER BY salary DESC
-        """
-        
-        # Execute with Oracle-native correlation context
-        execute_with_correlation(cursor, query, correlation_id, user_action)
-        
-        columns = [desc[0] for desc in cursor.description]
-        rows = cursor.fetchall()
-        
-        employees = [dict(zip(columns, row)) for row in rows]
-        
-        # Add correlation tracking to response
-        result = {
-            "query_type": "high_salary_filter",
-            "explain_plan_hint": "INDEX range scan on salary",
-            "threshold": 60000,
-            "count": len(employees),
-            "employees": employees,
-            "correlation_id": correlation_id,
-            "observability": {
-                "user_action": user_action,
-                "sql_executed": True,
-                "table": "employees",
-                "oracle_native_correlation": True,
-                "correlation_method": "DBMS_SESSION.SET_IDENTIFIER"
-            }
+    if current_span.is_recording():
+        current_span.set_attribute("http.not_modified", True)
+    return etag, not_modified(etag)
+
+def is_call_timeout(error):
+    """DPY-4024 (thin) / DPI-1067 (thick): a round trip outlasted connection.call_timeout"""
+    message = str(error)
+    return "DPY-4024" in message or "DPI-1067" in message
+
+def build_result(query, rows, plan, correlation_id, user_action, sql_executed=True):
+    """Response body of a registered query"""
+    result = {
+        "query_type": query.name,
+        "explain_plan_hint": query.explain_plan_hint,
+        "execution_plan": plan,
+    }
+    result.update(query.response_fields)
+    if query.single_row:
+        # One aggregate row, keyed by lower-case column name
+        result[query.result_key] = {column.lower(): value for column, value in rows[0].items()} if rows else {}
+    else:
+        if query.include_count:
+            result["count"] = len(rows)
+        result[query.result_key] = rows
+    if query.correlated:
+        result["correlation_id"] = correlation_id
+        result["observability"] = {
+            "user_action": user_action,
+            "sql_executed": sql_executed,
+            "table": query.table,
+            "oracle_native_correlation": True,
+            "correlation_method": "DBMS_SESSION.SET_IDENTIFIER"
         }
-        
-        # Add response details to span
-        if current_span:
-            current_span.set_attribute("response.record_count", len(employees))
-            current_span.set_attribute("database.table", "employees")
-        
-        return result
-    
-    finally:
-        cursor.close()
-        connection.close()
+    return result
 
-@app.get("/api/analytics/salary-stats")
-async def get_salary_analytics(request: Request):
-    """Get salary analytics - triggers aggregation with GROUP BY using Oracle-native correlation"""
-    # Extract correlation ID from RUM trace context  
-    correlation_id, user_action = extract_correlation_from_request(request)
-    if user_action == "unknown":
-        user_action = "salary-analytics"
-        # Update the span attribute since we refined the user_action
-        current_span = trace.get_current_span()
-        if current_span:
-            current_span.set_attribute("user_action", user_action)
+def cached_response(query, instance_type, version, etag, correlation_id, user_action):
+    """Response from the query's result cache, or None when caching is off or nothing fresh is cached"""
+    if not query.profile.cache_ttl:
+        return None
+    cached = query.cache.get(instance_type, version)
+    if cached is None:
+        return None
+    rows, plan = cached
+    current_span = trace.get_current_span()
+    if current_span.is_recording():
+        current_span.set_attribute("api.cache.hit", True)
+    note_rows(len(rows))
+    return encode_response(build_result(query, rows, plan, correlation_id, user_action, sql_executed=False), etag)
+
+class ResultStream:
+    """A query's rows streamed as JSON arraysize rows at a time; count and plan follow the rows
+
+    Owns the connection until close(). The generator runs on the threadpool one chunk at a
+    time, so close() takes the same lock to wait out a fetch still in flight after a disconnect.
+    """
+
+    def __init__(self, query, instance_type, connection, cursor, head, first_rows):
+        self.query = query
+        self.instance_type = instance_type
+        self.connection = connection
+        self.cursor = cursor
+        self.head = head
+        self.first_rows = first_rows
+        self.lock = threading.Lock()
+        self.closed = False
+        self.sent = 0
+
+    def send(self, chunk):
+        # Counted as they go out, so an aborted stream still reports what it sent
+        self.sent += len(chunk)
+        note_bytes(self.sent)
+        return chunk
+
+    def chunks(self):
+        query, cursor = self.query, self.cursor
+        with self.lock:
+            with phase("encode"):
+                opening = json_bytes(self.head)[:-1] + b',"' + query.result_key.encode() + b'":['
+                chunk = opening + json_bytes(self.first_rows)[1:-1]
+        yield self.send(chunk)
+        count = len(self.first_rows)
+        while True:
+            with self.lock:
+                if self.closed:
+                    return
+                try:
+                    with phase("fetch"):
+                        rows = cursor.fetchmany()
+                except Exception as e:
+                    # Headers are already sent - abort the response rather than end a truncated 200
+                    print(f"Warning: Aborting {query.path} stream after {count} rows: {e}")
+                    raise
+                if not rows:
+                    break
+                with phase("encode"):
+                    chunk = b"," + json_bytes(rows)[1:-1]
+            yield self.send(chunk)
+            count += len(rows)
+        with self.lock:
+            if self.closed:
+                return
+            note_rows(count)
+            record_fetch(cursor, query.path, count)
+            tail = {"execution_plan": capture_plan(cursor, query.path)}
+            if query.include_count:
+                tail["count"] = count
+            with phase("encode"):
+                chunk = b"]," + json_bytes(tail)[1:]
+        yield self.send(chunk)
+
+    def close(self):
+        """Release the connection; safe to call more than once"""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+        release_oracle_connection(self.instance_type, self.connection, self.cursor)
+
+
+class QueryStreamingResponse(StreamingResponse):
+    """Streams a ResultStream, then releases its connection and concurrency slot
+
+    Released however the response ends - completed, aborted, or the client disconnected
+    before or during the body.
+    """
+
+    def __init__(self, stream, etag=None):
+        super().__init__(stream.chunks(), media_type="application/json")
+        if etag is not None:
+            self.headers["ETag"] = etag
+        self.stream = stream
+        # Set by the endpoint when the query has a concurrency limit
+        self.limiter = None
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            with anyio.CancelScope(shield=True):
+                await run_in_threadpool(self.stream.close)
+            if self.limiter is not None:
+                self.limiter.release()
+
+def run_registered_query(query, request):
+    """Execute a registered query under its profile: correlation, ETag, cache, timeout, fetch sizing, streaming"""
+    profile = query.profile
+    correlation_id, user_action = None, None
+    if query.correlated:
+        # Extract correlation ID from RUM trace context
+        correlation_id, user_action = extract_correlation_from_request(request)
+        if user_action == "unknown" and query.default_user_action:
+            user_action = query.default_user_action
     
     # Add additional span attributes for this endpoint
     current_span = trace.get_current_span()
-    if current_span:
+    if current_span.is_recording():
+        if user_action is not None:
+            # Update the span attribute in case the user_action was refined
+            current_span.set_attribute("user_action", user_action)
         current_span.set_attribute("observability.layer", "api")
         current_span.set_attribute("database.operation", "select")
-        current_span.set_attribute("oracle.native_correlation", True)
-        current_span.set_attribute("api.endpoint", "/api/analytics/salary-stats")
+        current_span.set_attribute("oracle.native_correlation", query.correlated)
+        current_span.set_attribute("api.endpoint", query.path)
         current_span.set_attribute("api.method", "GET")
+        current_span.set_attribute("api.query", query.name)
     
-    # Route to analytics instance for aggregation queries
-    instance_type = select_instance_for_workload('salary-analytics')
+    # Route to the Oracle instance for the query's workload
+    instance_type = select_instance_for_workload(query.workload)
+    # Counter versions need no connection, so unchanged data returns before one is taken
+    etag, unchanged = check_not_modified(request, query.path, instance_type, query.table)
+    if unchanged is not None:
+        return unchanged
+    if not needs_probe():
+        cached = cached_response(query, instance_type, etag, etag, correlation_id, user_action)
+        if cached is not None:
+            return cached
     connection = get_oracle_connection(instance_type)
     cursor = connection.cursor()
+    streaming = False
     
     # Add instance information to span
-    if current_span:
+    if current_span.is_recording():
         current_span.set_attribute("database.instance.type", instance_type)
         current_span.set_attribute("database.instance.config", ORACLE_INSTANCES[instance_type]['service'])
     
     try:
-        # Get OpenTelemetry trace context for embedding in SQL
-        current_span_for_sql = trace.get_current_span()
-        trace_id = "unknown"
-        span_id = "unknown"
-        
-        if current_span_for_sql and current_span_for_sql.get_span_context().trace_id != 0:
-            trace_id = format(current_span_for_sql.get_span_context().trace_id, '032x')
-            span_id = format(current_span_for_sql.get_span_context().span_id, '016x')
-        
-        # SQL with embedded OpenTelemetry trace context and correlation ID for analytics workload
-        query = f"""
-        SELECT /*+ FULL(e) PARALLEL(e,2) */ /* correlation_id={correlation_id} user_action={user_action} otel_trace_id={trace_id} otel_span_id={span_id} */
-            TRUNC(hire_date, 'MONTH') as hire_month,
-            COUNT(*) as employee_count,
-            AVG(salary) as avg_salary,
-            MIN(salary) as min_salary,
-            MAX(salary) as max_salary
-        FROM employees e
-        GROUP BY TRUNC(hire_date, 'MONTH')
-        ORDER BY hire_month DESC
-        """
-        
-        # Execute with Oracle-native correlation context
-        execute_with_correlation(cursor, query, correlation_id, user_action)
-        
-        columns = [desc[0] for desc in cursor.description]
-        rows = cursor.fetchall()
-        
-        analytics = []
-        for row in rows:
-            record = dict(zip(columns, row))
-            # Convert datetime to string
-            if record.get('HIRE_MONTH'):
-                record['HIRE_MONTH'] = record['HIRE_MONTH'].isoformat()
-            # Round salary values
-            if record.get('AVG_SALARY'):
-                record['AVG_SALARY'] = round(float(record['AVG_SALARY']), 2)
-            analytics.append(record)
+        if needs_probe():
+            etag, unchanged = check_not_modified(request, query.path, instance_type, query.table, cursor)
+            if unchanged is not None:
+                return unchanged
+            cached = cached_response(query, instance_type, etag, etag, correlation_id, user_action)
+            if cached is not None:
+                return cached
+        
+        # OpenTelemetry trace context for embedding in SQL (sampled, correlated queries only)
+        correlation_comment = sql_correlation_comment(correlation_id, user_action) if query.correlated else ""
+        sql = query.render_sql(correlation_comment)
+        
+        # Per-query conversions run as values are fetched
+        if query.output_type_handler is not None:
+            cursor.outputtypehandler = query.output_type_handler
+        if profile.prefetchrows is not None:
+            cursor.prefetchrows = profile.prefetchrows
+            cursor.arraysize = profile.arraysize or profile.prefetchrows
+        else:
+            # Fetch sizes learned from this query's previous results
+            tune_fetch(cursor, query.path)
+        # Bounds every round trip of this query, including each fetch
+        connection.call_timeout = profile.timeout_ms
+        
+        try:
+            if query.correlated:
+                # Execute with Oracle-native correlation context
+                execute_with_correlation(cursor, sql, correlation_id, user_action, query.binds)
+            else:
+                execute_sql(cursor, sql, query.binds)
+            # Rows come back as dicts; datetimes stay datetimes and are encoded as ISO 8601
+            dict_rows(cursor)
+            
+            if profile.streamable and (recent_rows(query.path) or 0) >= API_STREAM_MIN_ROWS:
+                if current_span.is_recording():
+                    current_span.set_attribute("api.streamed", True)
+                # The first batch is fetched here, so a timeout before any rows is still a 504
+                with phase("fetch"):
+                    first_rows = cursor.fetchmany()
+                head = build_result(query, [], None, correlation_id, user_action)
+                for deferred in ("execution_plan", "count", query.result_key):
+                    head.pop(deferred, None)
+                stream = ResultStream(query, instance_type, connection, cursor, head, first_rows)
+                # The response releases the connection once the stream ends
+                streaming = True
+                return QueryStreamingResponse(stream, etag)
+            
+            with phase("fetch"):
+                rows = cursor.fetchmany(1) if query.single_row else cursor.fetchall()
+        except Exception as e:
+            if is_call_timeout(e):
+                raise HTTPException(status_code=504,
+                                    detail=f"{query.name} exceeded its {profile.timeout_ms}ms call timeout")
+            raise
+        note_rows(len(rows))
+        record_fetch(cursor, query.path, len(rows))
+        plan = capture_plan(cursor, query.path)
+        if profile.cache_ttl:
+            query.cache.put(instance_type, etag, (rows, plan), profile.cache_ttl)
         
-        # Add correlation tracking to response
-        result = {
-            "query_type": "salary_analytics",
-            "explain_plan_hint": "FULL scan with GROUP BY aggregation",
-            "analytics": analytics,
-            "correlation_id": correlation_id,
-            "observability": {
-                "user_action": user_action,
-                "sql_executed": True,
-                "table": "employees",
-                "oracle_native_correlation": True,
-                "correlation_method": "DBMS_SESSION.SET_IDENTIFIER"
-            }
-        }
+        # Add response details to span
+        if current_span.is_recording():
+            current_span.set_attribute("response.record_count", len(rows))
+            current_span.set_attribute("database.table", query.table)
         
-        return result
+        return encode_response(build_result(query, rows, plan, correlation_id, user_action), etag)
     
     finally:
-        cursor.close()
-        connection.close()
+        if not streaming:
+            release_oracle_connection(instance_type, connection, cursor)
+
+def query_endpoint(query):
+    """GET handler serving query through the execution engine"""
+    async def endpoint(request: Request):
+        # Blocking driver calls run on the threadpool, leaving the event loop free
+        if query.limiter is None:
+            return await run_in_threadpool(run_registered_query, query, request)
+        with phase("queue"):
+            await query.limiter.acquire()
+        response = None
+        try:
+            response = await run_in_threadpool(run_registered_query, query, request)
+            return response
+        finally:
+            if isinstance(response, QueryStreamingResponse):
+                # Held until the stream ends
+                response.limiter = query.limiter
+            else:
+                query.limiter.release()
+    endpoint.__name__ = query.name
+    endpoint.__doc__ = query.summary
+    return endpoint
+
+@app.get("/")
+async def root():
+    return {"message": "Oracle Demo API - Ready to trigger database queries!"}
+
+# One GET route per registered query (see queries.py)
+for registered_query in QUERIES:
+    app.add_api_route(registered_query.path, query_endpoint(registered_query), methods=["GET"],
+                      name=registered_query.name, summary=registered_query.summary)
 
 @app.post("/api/employees")
-async def create_employee(employee_data: dict):
+def create_employee(employee_data: dict):
     """Create new employee - triggers INSERT with possible index updates"""
+    # A plain def: FastAPI runs it on the threadpool, so the pool wait and driver calls stay off the loop
     # Route to primary instance for transactional operations
     instance_type = select_instance_for_workload('OLTP')
     connection = get_oracle_connection(instance_type)
@@ -486,10 +645,14 @@ async def create_employee(employee_data: dict):
         VALUES (:1, :2, :3, :4, :5)
         """
         
-        cursor.execute(insert_query, (new_id, first_name, last_name, salary, hire_date))
-        connection.commit()
+        with phase("execute"):
+            cursor.execute(insert_query, (new_id, first_name, last_name, salary, hire_date))
+        with phase("commit"):
+            connection.commit()
+        # New version for the ETags of reads served from this instance
+        table_changed(instance_type, "employees")
         
-        return {
+        return encode_response({
             "query_type": "employee_insert",
             "explain_plan_hint": "INSERT with index maintenance",
             "employee": {
@@ -499,91 +662,49 @@ async def create_employee(employee_data: dict):
                 "salary": round(salary, 2),
                 "hire_date": hire_date.isoformat()
             }
-        }
+        })
     
     finally:
-        cursor.close()
-        connection.close()
+        release_oracle_connection(instance_type, connection, cursor)
 
-@app.get("/api/complex-query")
-async def run_complex_query():
-    """Run complex query - triggers self-join with multiple operations"""
-    # Route to secondary instance for complex analytical queries
-    instance_type = select_instance_for_workload('analytics')
-    connection = get_oracle_connection(instance_type)
-    cursor = connection.cursor()
-    
-    try:
-        query = """
-        SELECT /*+ USE_NL(e1 e2) */ 
-            e1.employee_id,
-            e1.first_name || ' ' || e1.last_name as employee_name,
-            e1.salary as employee_salary,
-            COUNT(e2.employee_id) as higher_paid_colleagues
-        FROM employees e1
-        LEFT JOIN employees e2 ON e2.salary > e1.salary
-        WHERE e1.salary > 50000
-        GROUP BY e1.employee_id, e1.first_name, e1.last_name, e1.salary
-        ORDER BY e1.salary DESC
-        """
-        
-        cursor.execute(query)
-        columns = [desc[0] for desc in cursor.description]
-        rows = cursor.fetchall()
-        
-        results = [dict(zip(columns, row)) for row in rows]
-        
-        return {
-            "query_type": "complex_self_join",
-            "explain_plan_hint": "Nested loops self-join with aggregation",
-            "description": "Shows each employee and count of colleagues earning more",
-            "results": results
-        }
-    
-    finally:
-        cursor.close()
-        connection.close()
+@app.get("/api/plans")
+async def get_captured_plans():
+    """Execution plans captured from DBMS_XPLAN.DISPLAY_CURSOR, most recently used first"""
+    plans = cached_plans()
+    return {"count": len(plans), "plans": plans}
 
-@app.get("/api/slow-query")
-async def run_slow_query():
-    """Run intentionally slow query for performance testing"""
-    # Route to legacy instance for resource-intensive queries
-    instance_type = select_instance_for_workload('reporting')
-    connection = get_oracle_connection(instance_type)
-    cursor = connection.cursor()
-    
-    try:
-        # Cross join to create a slow query
-        query = """
-        SELECT /*+ NO_INDEX(e1) NO_INDEX(e2) */ 
-            COUNT(*) as cartesian_count
-        FROM employees e1, employees e2
-        WHERE e1.salary + e2.salary > 100000
-        """
-        
-        cursor.execute(query)
-        result = cursor.fetchone()
-        
-        return {
-            "query_type": "slow_cartesian_product",
-            "explain_plan_hint": "Cartesian product without indexes",
-            "warning": "This query intentionally generates heavy load",
-            "result": {"cartesian_count": result[0] if result else 0}
+@app.get("/api/queries")
+async def get_registered_queries():
+    """Registered queries with their instance and effective execution profile"""
+    return {"queries": [
+        {
+            "name": query.name,
+            "path": query.path,
+            "workload": query.workload,
+            "instance": select_instance_for_workload(query.workload),
+            "profile": query.profile.as_dict()
         }
-    
-    finally:
-        cursor.close()
-        connection.close()
+        for query in QUERIES
+    ]}
+
+@app.get("/api/fetch-profiles")
+async def get_fetch_profiles():
+    """Fetch sizes the adaptive tuner chose for each query shape"""
+    return {"profiles": fetch_profiles()}
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus scrape endpoint for API-side metrics"""
+    body, content_type = render_prometheus()
+    return Response(content=body, media_type=content_type)
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    try:
-        connection = get_oracle_connection('primary')
-        cursor = connection.cursor()
-        cursor.execute("SELECT 1 FROM DUAL")
-        cursor.close()
-        connection.close()
-        return {"status": "healthy", "database": "connected"}
-    except Exception as e:
-        return {"status": "unhealthy", "error": str(e)}
\ No newline at end of file
+    """Readiness of this worker's connection pools - no new connection per check"""
+    status = connection_pools.status()
+    return FastJSONResponse(content={
+        "status": status,
+        "database": "connected" if status == "healthy" else "not ready",
+        "worker_pid": os.getpid(),
+        "instances": connection_pools.readiness()
+    }, status_code=200 if status == "healthy" else 503)
@@ -0,0 +1,238 @@
+"""API-side metrics for the Oracle Demo API
+
+Exposes request latency, in-flight requests, per-instance connection usage, rows fetched,
+bytes serialized and errors through an OpenTelemetry MeterProvider with two readers:
+a Prometheus reader served on /metrics and an OTLP reader that pushes to the collector
+next to the trace pipeline (OTEL_METRICS_EXPORTER=none disables the push). The OTLP
+exporter is imported and created at the first push, keeping gRPC setup off the boot path.
+With connection pools the connection gauges report the pools' own open/busy counts.
+"""
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from opentelemetry import metrics
+from opentelemetry.exporter.prometheus import PrometheusMetricReader
+from opentelemetry.metrics import Observation
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import MetricExporter, PeriodicExportingMetricReader
+from opentelemetry.sdk.metrics.view import ExplicitBucketHistogramAggregation, View
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+
+OTEL_METRICS_EXPORTER = os.getenv("OTEL_METRICS_EXPORTER", "otlp").lower()
+API_METRICS_EXPORT_INTERVAL_MS = int(os.getenv("API_METRICS_EXPORT_INTERVAL_MS", "10000"))
+
+ROW_BUCKETS = [0, 1, 10, 100, 1000, 10000, 100000, 1000000]
+ROUND_TRIP_BUCKETS = [0, 1, 2, 3, 5, 10, 100, 1000, 10000]
+BYTE_BUCKETS = [256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864]
+
+_request_metrics = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """Values noted by handlers during a request, recorded when the response completes"""
+    __slots__ = ("instance", "rows", "bytes")
+
+    def __init__(self):
+        self.instance = None
+        self.rows = None
+        self.bytes = None
+
+
+class ConnectionTracker:
+    """Open/busy connection counts per Oracle instance"""
+
+    def __init__(self, instances):
+        self.lock = threading.Lock()
+        self.open = {instance: 0 for instance in instances}
+        self.busy = {instance: 0 for instance in instances}
+        # Backends with a real pool can override these with live pool statistics
+        self.pool_stats = None
+
+    def opened(self, instance):
+        with self.lock:
+            self.open[instance] = self.open.get(instance, 0) + 1
+            self.busy[instance] = self.busy.get(instance, 0) + 1
+
+    def closed(self, instance):
+        with self.lock:
+            self.open[instance] = self.open.get(instance, 0) - 1
+            self.busy[instance] = self.busy.get(instance, 0) - 1
+
+    def observe(self, kind):
+        if self.pool_stats is not None:
+            return [Observation(stats[kind], {"db.instance": instance}) for instance, stats in self.pool_stats().items()]
+        counts = self.open if kind == "open" else self.busy
+        with self.lock:
+            return [Observation(count, {"db.instance": instance}) for instance, count in counts.items()]
+
+
+class DeferredMetricExporter(MetricExporter):
+    """OTLP/gRPC metric exporter created on the reader's export thread at the first push"""
+
+    def __init__(self, endpoint):
+        super().__init__()
+        self.endpoint = endpoint
+        self.exporter = None
+
+    def get_exporter(self):
+        if self.exporter is None:
+            from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
+            self.exporter = OTLPMetricExporter(endpoint=self.endpoint, insecure=True)
+        return self.exporter
+
+    def export(self, metrics_data, timeout_millis=10000, **kwargs):
+        return self.get_exporter().export(metrics_data, timeout_millis=timeout_millis, **kwargs)
+
+    def force_flush(self, timeout_millis=10000):
+        return self.exporter.force_flush(timeout_millis) if self.exporter is not None else True
+
+    def shutdown(self, timeout_millis=30000, **kwargs):
+        if self.exporter is not None:
+            self.exporter.shutdown(timeout_millis=timeout_millis, **kwargs)
+
+
+class ApiMetrics:
+    """Instruments for API-side saturation"""
+
+    def __init__(self, resource, instances, otlp_endpoint):
+        readers = [PrometheusMetricReader()]
+        if OTEL_METRICS_EXPORTER != "none":
+            readers.append(PeriodicExportingMetricReader(
+                DeferredMetricExporter(otlp_endpoint),
+                export_interval_millis=API_METRICS_EXPORT_INTERVAL_MS
+            ))
+        views = [
+            View(instrument_name="api.response.rows", aggregation=ExplicitBucketHistogramAggregation(ROW_BUCKETS)),
+            View(instrument_name="api.response.bytes", aggregation=ExplicitBucketHistogramAggregation(BYTE_BUCKETS)),
+            View(instrument_name="api.db.fetch.round_trips.estimated",
+                 aggregation=ExplicitBucketHistogramAggregation(ROUND_TRIP_BUCKETS)),
+        ]
+        self.provider = MeterProvider(resource=resource, metric_readers=readers, views=views)
+        metrics.set_meter_provider(self.provider)
+        meter = self.provider.get_meter("oracle-api")
+
+        self.connections = ConnectionTracker(instances)
+        self.request_duration = meter.create_histogram(
+            "api.request.duration", unit="ms", description="API request latency by endpoint and Oracle instance")
+        self.in_flight = meter.create_up_down_counter(
+            "api.requests.in_flight", unit="{request}", description="Requests currently being served")
+        self.connection_wait = meter.create_histogram(
+            "api.db.connection.wait", unit="ms", description="Time spent acquiring an Oracle connection")
+        self.rows = meter.create_histogram(
+            "api.response.rows", unit="{row}", description="Rows fetched per request")
+        self.bytes = meter.create_histogram(
+            "api.response.bytes", unit="By", description="Response bytes serialized per request")
+        self.errors = meter.create_counter(
+            "api.errors", unit="{error}", description="Request errors by type")
+        meter.create_observable_gauge(
+            "api.db.connections.open", callbacks=[lambda options: self.connections.observe("open")],
+            unit="{connection}", description="Open Oracle connections per instance")
+        meter.create_observable_gauge(
+            "api.db.connections.busy", callbacks=[lambda options: self.connections.observe("busy")],
+            unit="{connection}", description="Oracle connections in use per instance")
+
+
+# Configured by init_metrics() at startup
+api_metrics = None
+
+
+def init_metrics(resource, instances, otlp_endpoint):
+    global api_metrics
+    api_metrics = ApiMetrics(resource, instances, otlp_endpoint)
+    return api_metrics
+
+
+def use_pool_stats(pool_stats):
+    """Report the connection gauges from pool_stats() -> {instance: {"open": n, "busy": n}}"""
+    if api_metrics is not None:
+        api_metrics.connections.pool_stats = pool_stats
+
+
+def note_instance(instance):
+    request_metrics = _request_metrics.get()
+    if request_metrics is not None:
+        request_metrics.instance = instance
+
+
+def note_rows(count):
+    request_metrics = _request_metrics.get()
+    if request_metrics is not None:
+        request_metrics.rows = count
+
+
+def note_bytes(count):
+    request_metrics = _request_metrics.get()
+    if request_metrics is not None:
+        request_metrics.bytes = count
+
+
+def connection_acquired(instance, wait_seconds):
+    if api_metrics is not None:
+        api_metrics.connections.opened(instance)
+        api_metrics.connection_wait.record(wait_seconds * 1000, {"db.instance": instance})
+
+
+def connection_released(instance):
+    if api_metrics is not None:
+        api_metrics.connections.closed(instance)
+
+
+def render_prometheus():
+    """Body and content type for the /metrics endpoint"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording latency, in-flight, rows, bytes and errors per endpoint"""
+
+    def __init__(self, app, route_paths):
+        self.app = app
+        # Callable returning the app's route paths - unknown paths share one label to bound cardinality
+        self.route_paths = route_paths
+        self.known_paths = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or api_metrics is None:
+            await self.app(scope, receive, send)
+            return
+
+        if self.known_paths is None:
+            self.known_paths = set(self.route_paths())
+        route = scope["path"] if scope["path"] in self.known_paths else "other"
+        method = scope["method"]
+
+        request_metrics = RequestMetrics()
+        token = _request_metrics.set(request_metrics)
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        api_metrics.in_flight.add(1, {"http.route": route})
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception as e:
+            api_metrics.errors.add(1, {"http.route": route, "error.type": type(e).__name__})
+            raise
+        finally:
+            _request_metrics.reset(token)
+            api_metrics.in_flight.add(-1, {"http.route": route})
+            attributes = {
+                "http.route": route,
+                "http.method": method,
+                "http.status_code": status[0],
+                "db.instance": request_metrics.instance or "none"
+            }
+            api_metrics.request_duration.record((time.perf_counter() - start) * 1000, attributes)
+            if request_metrics.rows is not None:
+                api_metrics.rows.record(request_metrics.rows, {"http.route": route, "db.instance": attributes["db.instance"]})
+            if request_metrics.bytes is not None:
+                api_metrics.bytes.record(request_metrics.bytes, {"http.route": route})
+
+        if status[0] >= 400:
+            api_metrics.errors.add(1, {"http.route": route, "error.type": f"http_{status[0]}"})
@@ -0,0 +1,222 @@
+"""Execution plan capture and plan-regression detection for the Oracle Demo API
+
+After a handler's query has been fetched, capture_plan() resolves the cursor's sql_id and
+plan_hash_value from the session's previous statement, attaches them to the span and
+fetches DBMS_XPLAN.DISPLAY_CURSOR once per new plan hash into a bounded LRU cache
+(served on /api/plans). Each endpoint's execute+fetch latency is tracked per plan: when an
+endpoint switches plan and its median latency shifts by API_PLAN_LATENCY_SHIFT or more,
+a plan.change span event is emitted and api.plan.changes is incremented.
+
+API_PLAN_CAPTURE=sampled (default) captures on sampled requests only, =all on every
+request, =off disables capture.
+"""
+import os
+import statistics
+import threading
+import time
+from collections import OrderedDict, deque
+
+from opentelemetry import metrics, trace
+
+from timing import current_phases, phase
+
+API_PLAN_CAPTURE = os.getenv("API_PLAN_CAPTURE", "sampled").lower()
+API_PLAN_CACHE_SIZE = int(os.getenv("API_PLAN_CACHE_SIZE", "256"))
+API_PLAN_LATENCY_WINDOW = int(os.getenv("API_PLAN_LATENCY_WINDOW", "50"))
+# Executions under a new plan before its latency is compared with the old plan's
+API_PLAN_CHANGE_MIN_SAMPLES = int(os.getenv("API_PLAN_CHANGE_MIN_SAMPLES", "5"))
+# Ratio of median latencies (either direction) that counts as a shift
+API_PLAN_LATENCY_SHIFT = float(os.getenv("API_PLAN_LATENCY_SHIFT", "1.5"))
+
+# The lookup itself becomes the session's current statement, so prev_* is the handler's query
+PLAN_LOOKUP_SQL = """
+    SELECT s.prev_sql_id, s.prev_child_number, q.plan_hash_value
+    FROM v$session s
+    JOIN v$sql q ON q.sql_id = s.prev_sql_id AND q.child_number = s.prev_child_number
+    WHERE s.sid = SYS_CONTEXT('USERENV', 'SID')"""
+DISPLAY_CURSOR_SQL = "SELECT plan_table_output FROM TABLE(DBMS_XPLAN.DISPLAY_CURSOR(:1, :2, 'TYPICAL'))"
+# DISPLAY_CURSOR returns these as plan lines instead of raising
+DISPLAY_CURSOR_NO_PRIVILEGE = "User has no SELECT privilege"
+DISPLAY_CURSOR_NO_PLAN = "cannot fetch plan"
+# Missing table or privilege - capture can never succeed for this user
+PERMANENT_ERRORS = ("ORA-00942", "ORA-01031")
+
+# Proxy instrument - becomes live once the API's MeterProvider is installed
+plan_changes = metrics.get_meter("oracle-api").create_counter(
+    "api.plan.changes", unit="{change}", description="Plan changes with a latency shift by endpoint")
+
+
+class PlanCache:
+    """Bounded LRU of captured plans keyed by plan_hash_value"""
+
+    def __init__(self, size):
+        self.size = size
+        self.plans = OrderedDict()
+
+    def get(self, plan_hash):
+        plan = self.plans.get(plan_hash)
+        if plan is not None:
+            self.plans.move_to_end(plan_hash)
+        return plan
+
+    def put(self, plan_hash, plan):
+        self.plans[plan_hash] = plan
+        self.plans.move_to_end(plan_hash)
+        while len(self.plans) > self.size:
+            self.plans.popitem(last=False)
+
+    def values(self):
+        """Cached plans, most recently used first"""
+        return list(reversed(self.plans.values()))
+
+
+class EndpointPlan:
+    """Current plan of one endpoint and the latencies observed under it"""
+    __slots__ = ("plan_hash", "latencies", "previous_plan_hash", "previous_median_ms")
+
+    def __init__(self, plan_hash):
+        self.plan_hash = plan_hash
+        self.latencies = deque(maxlen=API_PLAN_LATENCY_WINDOW)
+        self.previous_plan_hash = None
+        self.previous_median_ms = None
+
+
+class PlanTracker:
+    """Detects plan changes that come with a latency shift, per endpoint"""
+
+    def __init__(self):
+        self.endpoints = {}
+
+    def observe(self, endpoint, plan_hash, latency_ms):
+        """Record one execution; returns plan.change event attributes when a shift is confirmed"""
+        state = self.endpoints.get(endpoint)
+        if state is None:
+            state = self.endpoints[endpoint] = EndpointPlan(plan_hash)
+        elif state.plan_hash != plan_hash:
+            # Compare the new plan against the old one once enough executions have been seen
+            previous = state
+            state = self.endpoints[endpoint] = EndpointPlan(plan_hash)
+            state.previous_plan_hash = previous.plan_hash
+            state.previous_median_ms = statistics.median(previous.latencies) if previous.latencies else None
+
+        if latency_ms is not None:
+            state.latencies.append(latency_ms)
+
+        if state.previous_median_ms is None or len(state.latencies) < API_PLAN_CHANGE_MIN_SAMPLES:
+            return None
+
+        median_ms = statistics.median(state.latencies)
+        previous_median_ms = state.previous_median_ms
+        # Compared once per change
+        state.previous_median_ms = None
+        ratio = median_ms / previous_median_ms if previous_median_ms > 0 else float("inf")
+        if ratio < API_PLAN_LATENCY_SHIFT and ratio > 1 / API_PLAN_LATENCY_SHIFT:
+            return None
+        return {
+            "plan.endpoint": endpoint,
+            "plan.previous_hash_value": state.previous_plan_hash,
+            "plan.hash_value": plan_hash,
+            "plan.previous_median_ms": round(previous_median_ms, 3),
+            "plan.median_ms": round(median_ms, 3),
+            "plan.latency_ratio": round(ratio, 3),
+        }
+
+
+class PlanCapture:
+    """Resolves, caches and tracks the plans used by each endpoint's query"""
+
+    def __init__(self, mode=API_PLAN_CAPTURE):
+        self.mode = mode
+        # Cleared when DISPLAY_CURSOR reports missing V$ grants; sql_id/plan hash are still captured
+        self.fetch_text = True
+        self.lock = threading.Lock()
+        self.cache = PlanCache(API_PLAN_CACHE_SIZE)
+        self.tracker = PlanTracker()
+
+    def enabled_for(self, span):
+        if self.mode == "off":
+            return False
+        return self.mode == "all" or span.is_recording()
+
+    def capture(self, cursor, endpoint):
+        """Capture the plan of the query just fetched on cursor; returns {sql_id, plan_hash_value} or None"""
+        span = trace.get_current_span()
+        if not self.enabled_for(span):
+            return None
+
+        try:
+            # The handler's dict rowfactory doesn't apply to the lookup queries
+            cursor.rowfactory = None
+            with phase("plan_lookup"):
+                cursor.execute(PLAN_LOOKUP_SQL)
+                row = cursor.fetchone()
+            if row is None or not row[2]:
+                return None
+            sql_id, child_number, plan_hash = row
+
+            with self.lock:
+                known = self.cache.get(plan_hash) is not None
+            if not known and self.fetch_text:
+                with phase("plan_fetch"):
+                    cursor.execute(DISPLAY_CURSOR_SQL, [sql_id, child_number])
+                    plan_text = "\n".join(line[0] or "" for line in cursor.fetchall())
+                if DISPLAY_CURSOR_NO_PRIVILEGE in plan_text:
+                    print(f"Warning: Plan text capture disabled, DBMS_XPLAN.DISPLAY_CURSOR needs "
+                          f"SELECT on V$SQL_PLAN, V$SESSION and V$SQL: {plan_text.strip().splitlines()[-1]}")
+                    self.fetch_text = False
+                elif DISPLAY_CURSOR_NO_PLAN not in plan_text:
+                    # A plan aged out of the shared pool is retried on the next execution
+                    with self.lock:
+                        self.cache.put(plan_hash, {
+                            "plan_hash_value": plan_hash,
+                            "sql_id": sql_id,
+                            "child_number": child_number,
+                            "endpoint": endpoint,
+                            "captured_at": time.time(),
+                            "plan": plan_text
+                        })
+        except Exception as e:
+            if any(code in str(e) for code in PERMANENT_ERRORS):
+                # Missing grants - switch off rather than fail every request
+                print(f"Warning: Plan capture disabled: {e}")
+                self.mode = "off"
+            else:
+                # Transient (e.g. a call timeout) - skip this request only
+                print(f"Warning: Plan capture skipped for {endpoint}: {e}")
+            return None
+
+        phases = current_phases()
+        latency_ms = None
+        if phases is not None:
+            latency_ms = phases.durations.get("execute", 0.0) + phases.durations.get("fetch", 0.0)
+        with self.lock:
+            change = self.tracker.observe(endpoint, plan_hash, latency_ms)
+
+        if span.is_recording():
+            span.set_attribute("db.oracle.sql_id", sql_id)
+            span.set_attribute("db.oracle.child_number", child_number)
+            span.set_attribute("db.oracle.plan_hash_value", plan_hash)
+        if change is not None:
+            change["plan.sql_id"] = sql_id
+            if span.is_recording():
+                span.add_event("plan.change", change)
+            plan_changes.add(1, {"http.route": endpoint})
+            print(f"[PLAN] {endpoint}: plan {change['plan.previous_hash_value']} -> {plan_hash}, "
+                  f"median {change['plan.previous_median_ms']}ms -> {change['plan.median_ms']}ms")
+
+        return {"sql_id": sql_id, "plan_hash_value": plan_hash}
+
+    def plans(self):
+        with self.lock:
+            return self.cache.values()
+
+
+plan_capture = PlanCapture()
+
+
+def capture_plan(cursor, endpoint):
+    return plan_capture.capture(cursor, endpoint)
+
+
+def cached_plans():
+    return plan_capture.plans()
@@ -0,0 +1,145 @@
+"""Per-worker Oracle connection pools for the Oracle Demo API
+
+Each instance's max_connections is a budget for the whole API, not for one process: with
+WEB_CONCURRENCY workers (the variable uvicorn and gunicorn read for their worker count) each
+worker's pool is capped at max_connections // WEB_CONCURRENCY, so all workers together stay
+within the instance limit. At startup every worker opens API_POOL_MIN sessions per instance
+in the background, running session setup on each, so the first requests find warm sessions.
+An instance that can't be reached at startup is retried with exponential backoff until it
+warms. /health reports per-instance readiness from these pools instead of opening a connection.
+"""
+import os
+import threading
+import time
+
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+API_POOL_MIN = int(os.getenv("API_POOL_MIN", "2"))  # warm sessions per instance per worker
+API_POOL_WAIT_TIMEOUT_MS = int(os.getenv("API_POOL_WAIT_TIMEOUT_MS", "5000"))
+# Instances that must be warm before /health reports ready
+API_READY_INSTANCES = [name.strip() for name in os.getenv("API_READY_INSTANCES", "primary").split(",") if name.strip()]
+
+# Backoff between warm-up attempts for an unreachable instance, seconds
+WARM_RETRY_INITIAL = 0.5
+WARM_RETRY_MAX = 30.0
+
+
+def connection_budget(max_connections, workers=WEB_CONCURRENCY):
+    """One worker's share of an instance's connection limit"""
+    return max(1, max_connections // workers)
+
+
+class InstancePool:
+    """Connection pool for one Oracle instance, created lazily and warmed at startup"""
+
+    def __init__(self, backend, instance_type, config, credentials, session_setup):
+        self.backend = backend
+        self.instance_type = instance_type
+        self.config = config
+        self.credentials = credentials
+        self.session_setup = session_setup
+        self.maximum = connection_budget(config['max_connections'])
+        self.minimum = min(API_POOL_MIN, self.maximum)
+        self.lock = threading.Lock()
+        self.pool = None
+        self.ready = False
+        self.error = None
+        self.warm_ms = None
+
+    def get_pool(self):
+        with self.lock:
+            if self.pool is None:
+                user, password, sid = self.credentials
+                self.pool = self.backend.create_pool(
+                    self.instance_type, self.config, user, password, sid,
+                    self.minimum, self.maximum, API_POOL_WAIT_TIMEOUT_MS,
+                    # Called for each new session only - pooled sessions keep their settings
+                    session_callback=lambda connection, requested_tag: self.session_setup(connection, self.config)
+                )
+            return self.pool
+
+    def acquire(self):
+        connection = self.get_pool().acquire()
+        if not self.ready:
+            # A pool that failed to warm at startup recovers once a session opens
+            self.ready, self.error = True, None
+        return connection
+
+    def warm_until_ready(self):
+        """Warm, retrying with backoff until it succeeds or a request's acquire got a session first"""
+        delay = WARM_RETRY_INITIAL
+        while not self.warm() and not self.ready:
+            time.sleep(delay)
+            delay = min(delay * 2, WARM_RETRY_MAX)
+
+    def warm(self):
+        """Open and set up the minimum sessions, then release them to the pool; True on success"""
+        start = time.perf_counter()
+        connections = []
+        try:
+            pool = self.get_pool()
+            for _ in range(self.minimum):
+                connections.append(pool.acquire())
+            self.ready, self.error = True, None
+            self.warm_ms = round((time.perf_counter() - start) * 1000, 3)
+            print(f"[POOL] {self.instance_type}: {self.minimum} warm of {self.maximum} per worker "
+                  f"({self.config['max_connections']} across {WEB_CONCURRENCY} workers) in {self.warm_ms}ms")
+            return True
+        except Exception as e:
+            self.error = str(e)
+            print(f"Warning: Connection pool warm-up failed for {self.instance_type}, retrying: {e}")
+            return False
+        finally:
+            for connection in connections:
+                connection.close()
+
+    def stats(self):
+        pool = self.pool
+        return {
+            "open": pool.opened if pool is not None else 0,
+            "busy": pool.busy if pool is not None else 0,
+        }
+
+    def readiness(self):
+        return dict(self.stats(), ready=self.ready, min=self.minimum, max=self.maximum,
+                    warm_ms=self.warm_ms, error=self.error)
+
+
+class PoolManager:
+    """Pools for every configured instance"""
+
+    def __init__(self, backend, instances, user, password, sid, session_setup):
+        self.pools = {
+            name: InstancePool(backend, name, config, (user, password, sid), session_setup)
+            for name, config in instances.items()
+        }
+        if WEB_CONCURRENCY > 1:
+            for pool in self.pools.values():
+                if pool.config['max_connections'] < WEB_CONCURRENCY:
+                    print(f"Warning: {pool.instance_type} allows {pool.config['max_connections']} connections, "
+                          f"fewer than {WEB_CONCURRENCY} workers with one each")
+
+    def acquire(self, instance_type):
+        return self.pools[instance_type].acquire()
+
+    def warm_in_background(self):
+        """Warm all instances concurrently without blocking startup"""
+        # Daemon threads - an instance that never comes up must not hold up shutdown
+        for pool in self.pools.values():
+            threading.Thread(target=pool.warm_until_ready, name=f"pool-warm-{pool.instance_type}", daemon=True).start()
+
+    def ready(self):
+        return all(self.pools[name].ready for name in API_READY_INSTANCES if name in self.pools)
+
+    def status(self):
+        """healthy, starting while a required instance is still warming, or unhealthy while one is failing"""
+        if self.ready():
+            return "healthy"
+        required = [self.pools[name] for name in API_READY_INSTANCES if name in self.pools]
+        return "unhealthy" if any(pool.error for pool in required if not pool.ready) else "starting"
+
+    def readiness(self):
+        return {name: pool.readiness() for name, pool in self.pools.items()}
+
+    def stats(self):
+        """Live open/busy counts per instance for the connection gauges"""
+        return {name: pool.stats() for name, pool in self.pools.items()}
@@ -0,0 +1,226 @@
+"""Declarative registry of the Oracle Demo API's read queries
+
+Each RegisteredQuery declares its endpoint, the workload that picks its Oracle instance, its
+SQL template and binds, the shape of its response and a QueryProfile:
+
+    timeout_ms          call timeout for each round trip of the query (0 = none); 504 when exceeded
+    cache_ttl           seconds a result is reused for the same data version (0 = no cache)
+    prefetchrows        fixed fetch sizes; None leaves them to the adaptive fetch tuner
+    arraysize
+    streamable          stream rows as they are fetched once the query's recent results (kept
+                        by the adaptive fetch tuner) reach API_STREAM_MIN_ROWS rows
+    concurrency_limit   executions in flight per worker (0 = unlimited); others wait their turn
+
+main.py registers a GET route per query and serves them all through one execution engine,
+so a query added here gets pooled, correlated, instrumented and tuned execution without any
+handler code. Profiles can be overridden per query name without code changes, e.g.
+API_QUERY_PROFILES='{"salary_analytics": {"cache_ttl": 30}, "slow_cartesian_product": {"concurrency_limit": 1}}'
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+
+from serialization import output_type_handler, round_to
+
+API_QUERY_PROFILES = json.loads(os.getenv("API_QUERY_PROFILES", "{}"))
+API_STREAM_MIN_ROWS = int(os.getenv("API_STREAM_MIN_ROWS", "10000"))
+
+HIGH_SALARY_THRESHOLD = 60000
+
+
+class QueryProfile:
+    """Performance profile of one registered query"""
+    __slots__ = ("timeout_ms", "cache_ttl", "prefetchrows", "arraysize", "streamable", "concurrency_limit")
+
+    def __init__(self, timeout_ms=0, cache_ttl=0, prefetchrows=None, arraysize=None, streamable=False,
+                 concurrency_limit=0):
+        self.timeout_ms = timeout_ms
+        self.cache_ttl = cache_ttl
+        self.prefetchrows = prefetchrows
+        self.arraysize = arraysize
+        self.streamable = streamable
+        self.concurrency_limit = concurrency_limit
+
+    def with_overrides(self, overrides):
+        values = {field: getattr(self, field) for field in self.__slots__}
+        unknown = set(overrides) - set(values)
+        if unknown:
+            raise ValueError(f"Unknown query profile fields: {', '.join(sorted(unknown))}")
+        values.update(overrides)
+        return QueryProfile(**values)
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+class ResultCache:
+    """Latest result of one query per instance, reused while unexpired and for the same data version"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def get(self, instance_type, version):
+        with self.lock:
+            entry = self.entries.get(instance_type)
+        if entry is None:
+            return None
+        expires_at, cached_version, rows = entry
+        if time.monotonic() >= expires_at or cached_version != version:
+            return None
+        return rows
+
+    def put(self, instance_type, version, rows, ttl):
+        with self.lock:
+            self.entries[instance_type] = (time.monotonic() + ttl, version, rows)
+
+
+class RegisteredQuery:
+    """One read endpoint: where it runs, what it runs and how its response is shaped"""
+
+    def __init__(self, name, path, workload, sql, explain_plan_hint, result_key, binds=None, summary=None,
+                 response_fields=None, include_count=False, single_row=False, correlated=True,
+                 default_user_action=None, conversions=None, table="employees", profile=None):
+        self.name = name
+        self.path = path
+        self.workload = workload
+        # {correlation_comment} is replaced with the request's trace context comment
+        self.sql = sql
+        self.binds = binds
+        self.summary = summary
+        self.explain_plan_hint = explain_plan_hint
+        self.result_key = result_key
+        self.response_fields = response_fields or {}
+        self.include_count = include_count
+        self.single_row = single_row
+        self.correlated = correlated
+        self.default_user_action = default_user_action
+        self.table = table
+        self.output_type_handler = output_type_handler(conversions) if conversions else None
+        self.profile = (profile or QueryProfile()).with_overrides(API_QUERY_PROFILES.get(name, {}))
+        self.cache = ResultCache()
+        # Created unbound; asyncio binds it to the server's loop on first use
+        self.limiter = asyncio.Semaphore(self.profile.concurrency_limit) if self.profile.concurrency_limit else None
+
+    def render_sql(self, correlation_comment=""):
+        return self.sql.format(correlation_comment=correlation_comment)
+
+
+QUERIES = [
+    RegisteredQuery(
+        name="employees_list",
+        path="/api/employees",
+        summary="Get employees list - triggers SELECT with explain plan using Oracle-native correlation",
+        workload="OLTP",
+        sql="""
+        SELECT /*+ FULL(e) */ {correlation_comment}
+            employee_id,
+            first_name,
+            last_name,
+            salary,
+            hire_date
+        FROM employees e
+        ORDER BY salary DESC
+        """,
+        explain_plan_hint="FULL table scan with ORDER BY",
+        result_key="employees",
+        include_count=True,
+        profile=QueryProfile(timeout_ms=10000, streamable=True)
+    ),
+    RegisteredQuery(
+        name="high_salary_filter",
+        path="/api/employees/high-salary",
+        summary="Get high salary employees - triggers INDEX scan with Oracle-native correlation",
+        workload="high-salary",
+        sql="""
+        SELECT /*+ INDEX_RS_ASC(e emp_salary_idx) */ {correlation_comment}
+            employee_id,
+            first_name,
+            last_name,
+            salary
+        FROM employees e
+        WHERE salary > :1
+        ORDER BY salary DESC
+        """,
+        binds=[HIGH_SALARY_THRESHOLD],
+        explain_plan_hint="INDEX range scan on salary",
+        result_key="employees",
+        response_fields={"threshold": HIGH_SALARY_THRESHOLD},
+        include_count=True,
+        default_user_action="high-salary",
+        profile=QueryProfile(timeout_ms=10000, streamable=True)
+    ),
+    RegisteredQuery(
+        name="salary_analytics",
+        path="/api/analytics/salary-stats",
+        summary="Get salary analytics - triggers aggregation with GROUP BY using Oracle-native correlation",
+        workload="salary-analytics",
+        sql="""
+        SELECT /*+ FULL(e) PARALLEL(e,2) */ {correlation_comment}
+            TRUNC(hire_date, 'MONTH') as hire_month,
+            COUNT(*) as employee_count,
+            AVG(salary) as avg_salary,
+            MIN(salary) as min_salary,
+            MAX(salary) as max_salary
+        FROM employees e
+        GROUP BY TRUNC(hire_date, 'MONTH')
+        ORDER BY hire_month DESC
+        """,
+        explain_plan_hint="FULL scan with GROUP BY aggregation",
+        result_key="analytics",
+        default_user_action="salary-analytics",
+        # AVG_SALARY is rounded as it is fetched
+        conversions={'AVG_SALARY': round_to(2)},
+        profile=QueryProfile(timeout_ms=30000)
+    ),
+    RegisteredQuery(
+        name="complex_self_join",
+        path="/api/complex-query",
+        summary="Run complex query - triggers self-join with multiple operations",
+        workload="analytics",
+        sql="""
+        SELECT /*+ USE_NL(e1 e2) */
+            e1.employee_id,
+            e1.first_name || ' ' || e1.last_name as employee_name,
+            e1.salary as employee_salary,
+            COUNT(e2.employee_id) as higher_paid_colleagues
+        FROM employees e1
+        LEFT JOIN employees e2 ON e2.salary > e1.salary
+        WHERE e1.salary > 50000
+        GROUP BY e1.employee_id, e1.first_name, e1.last_name, e1.salary
+        ORDER BY e1.salary DESC
+        """,
+        explain_plan_hint="Nested loops self-join with aggregation",
+        result_key="results",
+        response_fields={"description": "Shows each employee and count of colleagues earning more"},
+        correlated=False,
+        profile=QueryProfile(timeout_ms=60000, concurrency_limit=4)
+    ),
+    RegisteredQuery(
+        name="slow_cartesian_product",
+        path="/api/slow-query",
+        summary="Run intentionally slow query for performance testing",
+        workload="reporting",
+        sql="""
+        SELECT /*+ NO_INDEX(e1) NO_INDEX(e2) */
+            COUNT(*) as cartesian_count
+        FROM employees e1, employees e2
+        WHERE e1.salary + e2.salary > 100000
+        """,
+        explain_plan_hint="Cartesian product without indexes",
+        result_key="result",
+        response_fields={"warning": "This query intentionally generates heavy load"},
+        single_row=True,
+        correlated=False,
+        # One row: the driver's default prefetch already returns it with the execute
+        profile=QueryProfile(timeout_ms=120000, prefetchrows=2, arraysize=2, concurrency_limit=2)
+    ),
+]
+
+QUERIES_BY_NAME = {query.name: query for query in QUERIES}
+
+unknown_overrides = set(API_QUERY_PROFILES) - set(QUERIES_BY_NAME)
+if unknown_overrides:
+    print(f"Warning: API_QUERY_PROFILES names unknown queries: {', '.join(sorted(unknown_overrides))}")
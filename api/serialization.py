@@ -0,0 +1,53 @@
+"""Fetch-time row conversion and fast JSON encoding for the Oracle Demo API
+
+Handlers set an output type handler before executing and a dict rowfactory after, so the
+driver returns ready-to-encode rows in a single pass: per-column conversions (e.g. rounding
+AVG_SALARY) run as the values are fetched and no Python loop rebuilds the rows afterwards.
+Responses are encoded with orjson straight to bytes, skipping FastAPI's jsonable_encoder
+walk. orjson writes datetime values natively as ISO 8601, the same text isoformat() produced.
+"""
+from decimal import Decimal
+
+import orjson
+from fastapi.responses import Response
+
+
+def round_to(digits):
+    """Fetch a numeric column as float rounded to the given number of digits"""
+    return (float, lambda value: round(value, digits))
+
+
+def output_type_handler(conversions):
+    """Output type handler applying {column name: (fetch type, converter)} at fetch time"""
+    def handler(cursor, metadata):
+        conversion = conversions.get(metadata.name)
+        if conversion is not None:
+            fetch_type, converter = conversion
+            return cursor.var(fetch_type, arraysize=cursor.arraysize, outconverter=converter)
+    return handler
+
+
+def dict_rows(cursor):
+    """Have the driver build column-keyed dicts for the executed query as rows are fetched"""
+    columns = [desc[0] for desc in cursor.description]
+    cursor.rowfactory = lambda *row: dict(zip(columns, row))
+    return cursor
+
+
+def json_default(value):
+    # NUMBER columns arrive as Decimal when oracledb.defaults.fetch_decimals is set
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def json_bytes(content):
+    return orjson.dumps(content, default=json_default)
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded with orjson"""
+    media_type = "application/json"
+
+    def render(self, content):
+        return json_bytes(content)
@@ -0,0 +1,93 @@
+"""Per-request phase timing for the Oracle Demo API
+
+Each request gets a RequestPhases recorder in a context variable. Code wraps its steps in
+`with phase("execute"):` and the elapsed time is added to the request's phases. When the
+request finishes, a sampled server span gets one phase.<name>.duration_ms attribute per
+phase, and the client gets them in a Server-Timing header:
+
+    Server-Timing: connect;dur=12.41, session_setup;dur=1.02, execute;dur=3.87, ..., total;dur=25.10
+"""
+import time
+from contextvars import ContextVar
+
+from opentelemetry import trace
+
+_request_phases = ContextVar("request_phases", default=None)
+
+
+class RequestPhases:
+    """Accumulated phase durations (ms) for one request, in first-seen order"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.durations = {}
+
+    def add(self, name, duration_ms):
+        self.durations[name] = self.durations.get(name, 0.0) + duration_ms
+
+    def server_timing(self):
+        total_ms = (time.perf_counter() - self.start) * 1000
+        entries = [f"{name};dur={duration_ms:.2f}" for name, duration_ms in self.durations.items()]
+        entries.append(f"total;dur={total_ms:.2f}")
+        return ", ".join(entries)
+
+
+def current_phases():
+    return _request_phases.get()
+
+
+class phase:
+    """Time a block as a named phase of the current request: `with phase("execute"):`
+
+    A plain context manager rather than a generator one - it wraps every driver call.
+    """
+    __slots__ = ("name", "phases", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.phases = _request_phases.get()
+        if self.phases is not None:
+            self.start = time.perf_counter()
+
+    def __exit__(self, exc_type, exc, traceback):
+        # Span attributes are written once per request by the middleware, not per phase
+        if self.phases is not None:
+            self.phases.add(self.name, (time.perf_counter() - self.start) * 1000)
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware that collects request phases and emits the Server-Timing header"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        phases = RequestPhases()
+        token = _request_phases.set(phases)
+        # The instrumentation's server span
+        span = trace.get_current_span()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", phases.server_timing().encode()))
+                # Lets browser RUM read the header cross-origin
+                headers.append((b"timing-allow-origin", b"*"))
+                message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                # The server span ends as the last body chunk is sent
+                if span.is_recording():
+                    for name, duration_ms in phases.durations.items():
+                        span.set_attribute(f"phase.{name}.duration_ms", round(duration_ms, 3))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_phases.reset(token)
@@ -0,0 +1,139 @@
+"""Trace sampling and span export configuration for the Oracle Demo API
+
+Head sampling is ratio based (API_TRACE_SAMPLE_RATIO), optionally parent based
+(API_TRACE_PARENT_BASED, so upstream RUM/loadgen sampling decisions are honoured), with
+per-endpoint ratio overrides (API_TRACE_SAMPLE_RATIOS='{"/health": 0, "/api/slow-query": 1}').
+The BatchSpanProcessor queue is configured with the standard OTEL_BSP_* variables and
+spans it drops are counted in the api.spans.dropped metric. The OTLP exporter is imported
+and created on the export thread at the first batch, keeping gRPC setup off the boot path.
+"""
+import json
+import os
+import threading
+
+from opentelemetry import metrics
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace.sampling import ParentBased, Sampler, TraceIdRatioBased
+
+API_TRACE_SAMPLE_RATIO = float(os.getenv("API_TRACE_SAMPLE_RATIO", "1.0"))
+API_TRACE_PARENT_BASED = os.getenv("API_TRACE_PARENT_BASED", "true").lower() == "true"
+API_TRACE_SAMPLE_RATIOS = json.loads(os.getenv("API_TRACE_SAMPLE_RATIOS", "{}"))
+
+OTEL_BSP_MAX_QUEUE_SIZE = int(os.getenv("OTEL_BSP_MAX_QUEUE_SIZE", "2048"))
+OTEL_BSP_MAX_EXPORT_BATCH_SIZE = int(os.getenv("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", "512"))
+OTEL_BSP_SCHEDULE_DELAY = int(os.getenv("OTEL_BSP_SCHEDULE_DELAY", "5000"))  # export interval, ms
+OTEL_BSP_EXPORT_TIMEOUT = int(os.getenv("OTEL_BSP_EXPORT_TIMEOUT", "30000"))  # ms
+
+# Proxy instrument - becomes live once the API's MeterProvider is installed
+dropped_spans = metrics.get_meter("oracle-api").create_counter(
+    "api.spans.dropped", unit="{span}", description="Sampled spans dropped before reaching the collector")
+
+
+class EndpointRatioSampler(Sampler):
+    """Trace ID ratio sampler with per-endpoint ratio overrides"""
+
+    def __init__(self, default_ratio, endpoint_ratios):
+        self.default = TraceIdRatioBased(default_ratio)
+        self.endpoints = {path: TraceIdRatioBased(ratio) for path, ratio in endpoint_ratios.items()}
+
+    @staticmethod
+    def endpoint(name, attributes):
+        """Request path from the server span's attributes, falling back to its "GET /path" name"""
+        if attributes:
+            for key in ("http.route", "url.path", "http.target"):
+                value = attributes.get(key)
+                if value:
+                    return value.split("?", 1)[0]
+        return name.split(" ", 1)[1] if " " in name else name
+
+    def should_sample(self, parent_context, trace_id, name, kind=None, attributes=None, links=None, trace_state=None):
+        sampler = self.default
+        if self.endpoints:
+            sampler = self.endpoints.get(self.endpoint(name, attributes), self.default)
+        return sampler.should_sample(parent_context, trace_id, name, kind, attributes, links, trace_state)
+
+    def get_description(self):
+        return f"EndpointRatioSampler{{default={self.default.rate}, overrides={len(self.endpoints)}}}"
+
+
+def build_sampler():
+    """Head sampler from API_TRACE_* configuration"""
+    sampler = EndpointRatioSampler(API_TRACE_SAMPLE_RATIO, API_TRACE_SAMPLE_RATIOS)
+    return ParentBased(root=sampler) if API_TRACE_PARENT_BASED else sampler
+
+
+class CountingSpanExporter(SpanExporter):
+    """Delegating exporter that counts spans lost to failed exports"""
+
+    def __init__(self, exporter):
+        self.exporter = exporter
+
+    def export(self, spans):
+        result = self.exporter.export(spans)
+        if result != SpanExportResult.SUCCESS:
+            dropped_spans.add(len(spans), {"reason": "export_failed"})
+        return result
+
+    def shutdown(self):
+        return self.exporter.shutdown()
+
+    def force_flush(self, timeout_millis=30000):
+        return self.exporter.force_flush(timeout_millis)
+
+
+class DeferredSpanExporter(SpanExporter):
+    """Exporter created by factory on first export"""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.exporter = None
+        self.lock = threading.Lock()
+
+    def get_exporter(self):
+        with self.lock:
+            if self.exporter is None:
+                self.exporter = self.factory()
+            return self.exporter
+
+    def export(self, spans):
+        return self.get_exporter().export(spans)
+
+    def shutdown(self):
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+    def force_flush(self, timeout_millis=30000):
+        return self.exporter.force_flush(timeout_millis) if self.exporter is not None else True
+
+
+def otlp_span_exporter(endpoint):
+    """OTLP/gRPC span exporter, deferred until the first batch is exported"""
+    def create():
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter(endpoint=endpoint, insecure=True)
+    return DeferredSpanExporter(create)
+
+
+class CountingBatchSpanProcessor(BatchSpanProcessor):
+    """BatchSpanProcessor that counts spans dropped because the export queue is full"""
+
+    def __init__(self, exporter):
+        super().__init__(
+            CountingSpanExporter(exporter),
+            max_queue_size=OTEL_BSP_MAX_QUEUE_SIZE,
+            schedule_delay_millis=OTEL_BSP_SCHEDULE_DELAY,
+            max_export_batch_size=OTEL_BSP_MAX_EXPORT_BATCH_SIZE,
+            export_timeout_millis=OTEL_BSP_EXPORT_TIMEOUT,
+        )
+        # The queue lives on the shared BatchProcessor in newer SDKs and on the processor in older ones
+        processor = getattr(self, "_batch_processor", self)
+        self._span_queue = getattr(processor, "_queue", None)
+        if self._span_queue is None:
+            self._span_queue = getattr(processor, "queue", None)
+
+    def on_end(self, span):
+        queue = self._span_queue
+        if (queue is not None and span.context and span.context.trace_flags.sampled
+                and len(queue) >= OTEL_BSP_MAX_QUEUE_SIZE):
+            dropped_spans.add(1, {"reason": "queue_full"})
+        super().on_end(span)
@@ -0,0 +1,128 @@
+"""Cold-start time and first-request latency of the API under uvicorn
+
+Usage:
+    python benchmarks/cold_start.py                           # 1 worker, 3 runs
+    python benchmarks/cold_start.py --workers 4 --connect-latency-ms 80 --output cold.json
+
+Each run starts uvicorn with the fake backend (FAKE_ORACLE_CONNECT_LATENCY_MS stands in for
+an Oracle logon) and OTLP export pointed at an address nothing listens on, so exporter setup
+is part of boot. Reported per run, as medians across runs:
+
+    ready_ms        process start until /health answers 200
+    first_ms        the first /api/employees request after ready
+    steady_p50_ms   median of the following --requests requests
+
+With several workers /health is answered by whichever worker accepts the connection, so
+ready_ms is when the first worker is ready, not all of them.
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+API_DIR = os.path.join(os.path.dirname(BENCHMARK_DIR), "api")
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def get(url, timeout=10):
+    """(status, elapsed ms) of a GET; status 0 when the server isn't accepting connections yet"""
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, ConnectionError):
+        status = 0
+    return status, (time.perf_counter() - start) * 1000
+
+
+def run_once(args):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ)
+    env.setdefault("ORACLE_BACKEND", "fake")
+    env.setdefault("ORACLE_CORRELATION_DELAY_SECONDS", "0")
+    env.setdefault("OTEL_EXPORTER_OTLP_ENDPOINT", "http://127.0.0.1:9")
+    env["FAKE_ORACLE_CONNECT_LATENCY_MS"] = str(args.connect_latency_ms)
+    env["WEB_CONCURRENCY"] = str(args.workers)
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=API_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while True:
+            status, _ = get(f"{base_url}/health")
+            if status == 200:
+                break
+            if process.poll() is not None or time.perf_counter() - start > args.timeout:
+                raise RuntimeError(f"API did not become ready (last /health status {status})")
+            time.sleep(0.01)
+        ready_ms = (time.perf_counter() - start) * 1000
+
+        _, first_ms = get(f"{base_url}/api/employees")
+        steady = [get(f"{base_url}/api/employees")[1] for _ in range(args.requests)]
+        return {"ready_ms": ready_ms, "first_ms": first_ms, "steady_p50_ms": statistics.median(steady)}
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="API cold-start time and first-request latency")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=20, help="requests after the first for the steady median")
+    parser.add_argument("--connect-latency-ms", type=float, default=50.0, help="simulated Oracle logon time")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for readiness")
+    parser.add_argument("--output", help="write results JSON to this path")
+    args = parser.parse_args()
+
+    runs = []
+    for index in range(args.runs):
+        run = run_once(args)
+        runs.append(run)
+        print(f"[COLD] run {index + 1}: ready {run['ready_ms']:.0f}ms  first request {run['first_ms']:.1f}ms  "
+              f"steady p50 {run['steady_p50_ms']:.1f}ms")
+    summary = {key: round(statistics.median(run[key] for run in runs), 2) for key in runs[0]}
+    print(f"[COLD] median ({args.workers} worker(s)): ready {summary['ready_ms']:.0f}ms  "
+          f"first request {summary['first_ms']:.1f}ms  steady p50 {summary['steady_p50_ms']:.1f}ms")
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump({
+                "timestamp": datetime.now().isoformat(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "workers": args.workers,
+                "connect_latency_ms": args.connect_latency_ms,
+                "summary": summary,
+                "runs": runs
+            }, output_file, indent=2)
+        print(f"[COLD] Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,124 @@
+"""CPU cost of turning fetched rows into response bytes, before and after fetch-time conversion
+
+Usage:
+    python benchmarks/serialization_cpu.py                 # 100k rows, 5 repeats
+    python benchmarks/serialization_cpu.py --rows 1000000 --output cpu.json
+
+"before" is the original handler path: fetchall() tuples, a Python loop building dicts and
+calling isoformat()/round(float()), then jsonable_encoder and JSONResponse. "after" is the
+current path: output converters and the dict rowfactory applied as rows are fetched, then
+orjson straight to bytes. Both are reported as process CPU milliseconds per 100k rows.
+
+The "after" conversion is timed through the FetchCursor emulation in run_benchmarks.py, which
+applies the same output converters and rowfactory in Python. It is not the driver's own
+converter path, whose per-row cost depends on the python-oracledb build (thin or thick mode).
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from run_benchmarks import (ANALYTICS_COLUMNS, EMPLOYEE_COLUMNS, FetchCursor, analytics_rows,
+                            employee_rows, queries, serialization)
+
+
+def legacy_employee_rows(columns, rows):
+    employees = []
+    for row in rows:
+        employee = dict(zip(columns, row))
+        if employee.get('HIRE_DATE'):
+            employee['HIRE_DATE'] = employee['HIRE_DATE'].isoformat()
+        employees.append(employee)
+    return employees
+
+
+def legacy_analytics_rows(columns, rows):
+    analytics = []
+    for row in rows:
+        record = dict(zip(columns, row))
+        if record.get('HIRE_MONTH'):
+            record['HIRE_MONTH'] = record['HIRE_MONTH'].isoformat()
+        if record.get('AVG_SALARY'):
+            record['AVG_SALARY'] = round(float(record['AVG_SALARY']), 2)
+        analytics.append(record)
+    return analytics
+
+
+def legacy_encode(result):
+    return JSONResponse(content=jsonable_encoder(result)).body
+
+
+def fast_encode(result):
+    return serialization.FastJSONResponse(content=result).body
+
+
+def pipelines(row_count):
+    """(name, before, after) callables, each taking fetched tuples to response bytes"""
+    employees = employee_rows(row_count)
+    analytics = analytics_rows(row_count)
+    employee_cursor = FetchCursor(EMPLOYEE_COLUMNS)
+    analytics_cursor = FetchCursor(ANALYTICS_COLUMNS, queries.QUERIES_BY_NAME["salary_analytics"].output_type_handler)
+    return [
+        ("employees",
+         lambda: legacy_encode({"employees": legacy_employee_rows(EMPLOYEE_COLUMNS, list(employees))}),
+         lambda: fast_encode({"employees": employee_cursor.fetch(employees)})),
+        ("analytics",
+         lambda: legacy_encode({"analytics": legacy_analytics_rows(ANALYTICS_COLUMNS, list(analytics))}),
+         lambda: fast_encode({"analytics": analytics_cursor.fetch(analytics)})),
+    ]
+
+
+def cpu_ms(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.process_time()
+        func()
+        timings.append((time.process_time() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="CPU per 100k rows for the response serialization path")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="write results JSON to this path")
+    args = parser.parse_args()
+
+    scale = 100_000 / args.rows
+    results = {}
+    for name, before, after in pipelines(args.rows):
+        # Both paths must produce the same JSON
+        if json.loads(before()) != json.loads(after()):
+            print(f"[ERROR] {name}: before and after responses differ")
+            return 1
+        before_ms = cpu_ms(before, args.repeats) * scale
+        after_ms = cpu_ms(after, args.repeats) * scale
+        results[name] = {
+            "before_cpu_ms_per_100k": round(before_ms, 2),
+            "after_cpu_ms_per_100k": round(after_ms, 2),
+            "speedup": round(before_ms / after_ms, 2) if after_ms else None
+        }
+        print(f"[CPU] {name:<10} before {before_ms:>9.1f}ms  after {after_ms:>9.1f}ms  per 100k rows "
+              f"({results[name]['speedup']}x)")
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump({
+                "timestamp": datetime.now().isoformat(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "rows": args.rows,
+                "results": results
+            }, output_file, indent=2)
+        print(f"[CPU] Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,305 @@
+"""Incremental delta collector for Oracle v$ performance views
+
+Polls every Oracle instance independently over a small monitor connection pool and keeps
+the previous snapshot of each view in memory, so only changes are sent to the collector:
+
+    v$sysstat  - per-second rates of the tracked counters (the counters themselves are never sent)
+    v$sql      - executions/elapsed/CPU/buffer gets/disk reads/rows deltas, only for cursors whose
+                 last_active_time moved since the previous poll
+    v$session  - user session counts by status (a single GROUP BY, no per-session regex parsing)
+
+v$sql is filtered with a last_active_time watermark, so each poll only returns and diffs cursors
+active since the previous one; Oracle still scans the whole of v$sql (it has no index) to apply
+the filter. Each instance is polled on its own schedule. Metrics are pushed over OTLP with delta
+temporality.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+import oracledb
+from opentelemetry import metrics
+from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
+from opentelemetry.sdk.metrics import Counter, Histogram, MeterProvider, UpDownCounter
+from opentelemetry.sdk.metrics.export import AggregationTemporality, PeriodicExportingMetricReader
+from opentelemetry.sdk.resources import Resource
+
+# Monitor user - same credentials as the collector's sqlquery receivers
+ORACLE_MONITOR_USER = os.getenv("ORACLE_MONITOR_USER", "otel_monitor")
+ORACLE_MONITOR_PASSWORD = os.getenv("ORACLE_MONITOR_PASSWORD", "")
+ORACLE_MONITOR_TARGET_USER = os.getenv("ORACLE_MONITOR_TARGET_USER", "TESTUSER").upper()
+ORACLE_SID = os.getenv("ORACLE_SID", "xepdb1")
+
+ORACLE_INSTANCES = {
+    'primary': {'host': os.getenv("ORACLE_HOST_PRIMARY", "oracle-db-primary"), 'port': int(os.getenv("ORACLE_PORT_PRIMARY", "1521"))},
+    'secondary': {'host': os.getenv("ORACLE_HOST_SECONDARY", "oracle-db-secondary"), 'port': int(os.getenv("ORACLE_PORT_SECONDARY", "1521"))},
+    'legacy': {'host': os.getenv("ORACLE_HOST_LEGACY", "oracle-db-legacy"), 'port': int(os.getenv("ORACLE_PORT_LEGACY", "1521"))},
+}
+
+DELTA_COLLECTOR_INSTANCES = [name.strip() for name in os.getenv("DELTA_COLLECTOR_INSTANCES", ",".join(ORACLE_INSTANCES)).split(",") if name.strip()]
+DELTA_COLLECTOR_INTERVAL = float(os.getenv("DELTA_COLLECTOR_INTERVAL", "5"))  # seconds
+DELTA_COLLECTOR_POOL_MAX = int(os.getenv("DELTA_COLLECTOR_POOL_MAX", "2"))  # monitor connections per instance
+# Cursors not seen active for this long are forgotten
+DELTA_COLLECTOR_SQL_RETENTION = float(os.getenv("DELTA_COLLECTOR_SQL_RETENTION", "3600"))  # seconds
+OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://otel-collector:4317")
+DELTA_COLLECTOR_LOG_LEVEL = os.getenv("DELTA_COLLECTOR_LOG_LEVEL", "info").lower()
+DEBUG_LOGGING = DELTA_COLLECTOR_LOG_LEVEL == "debug"
+
+# v$sysstat counters turned into rates (override with a JSON list of statistic names)
+DEFAULT_SYSSTATS = [
+    'user commits', 'user rollbacks', 'user calls', 'execute count',
+    'parse count (total)', 'parse count (hard)', 'session logical reads',
+    'db block gets', 'consistent gets', 'physical reads', 'physical writes',
+    'redo size', 'enqueue waits', 'enqueue deadlocks',
+    'bytes sent via SQL*Net to client', 'bytes received via SQL*Net from client',
+]
+DELTA_COLLECTOR_SYSSTATS = json.loads(os.getenv("DELTA_COLLECTOR_SYSSTATS", "null")) or DEFAULT_SYSSTATS
+
+SESSIONS_SQL = """
+    SELECT status, COUNT(*)
+    FROM v$session
+    WHERE type = 'USER'
+    GROUP BY status"""
+
+SQL_STATS_SQL = """
+    SELECT sql_id, child_number, plan_hash_value, NVL(module, 'unknown'),
+           executions, elapsed_time, cpu_time, buffer_gets, disk_reads, rows_processed,
+           last_active_time
+    FROM v$sql
+    WHERE parsing_schema_name = :schema
+      AND last_active_time >= :since"""
+
+FIRST_POLL_SINCE = datetime(1970, 1, 1)
+
+# v$sql columns sent as deltas: (index in SQL_STATS_SQL row, metric name, unit, scale)
+SQL_DELTA_COLUMNS = [
+    (4, "oracle.delta.sql.executions", "{execution}", 1),
+    (5, "oracle.delta.sql.elapsed_time", "s", 1e-6),
+    (6, "oracle.delta.sql.cpu_time", "s", 1e-6),
+    (7, "oracle.delta.sql.buffer_gets", "{get}", 1),
+    (8, "oracle.delta.sql.disk_reads", "{read}", 1),
+    (9, "oracle.delta.sql.rows_processed", "{row}", 1),
+]
+
+
+def debug(message):
+    """Print per-poll detail only when DELTA_COLLECTOR_LOG_LEVEL=debug"""
+    if DEBUG_LOGGING:
+        print(message)
+
+
+def sysstat_query(names):
+    binds = ", ".join(f":{index + 1}" for index in range(len(names)))
+    return f"SELECT name, value FROM v$sysstat WHERE name IN ({binds})"
+
+
+class DeltaMetrics:
+    """OTLP instruments for the delta collector"""
+
+    def __init__(self):
+        resource = Resource.create({
+            "service.name": "oracle-delta-collector",
+            "service.version": "1.0.0",
+        })
+        # Delta temporality: each export carries only what changed since the previous one
+        exporter = OTLPMetricExporter(
+            endpoint=OTEL_EXPORTER_OTLP_ENDPOINT, insecure=True,
+            preferred_temporality={
+                Counter: AggregationTemporality.DELTA,
+                UpDownCounter: AggregationTemporality.CUMULATIVE,
+                Histogram: AggregationTemporality.DELTA,
+            }
+        )
+        reader = PeriodicExportingMetricReader(exporter, export_interval_millis=int(DELTA_COLLECTOR_INTERVAL * 1000))
+        self.provider = MeterProvider(resource=resource, metric_readers=[reader])
+        metrics.set_meter_provider(self.provider)
+        meter = self.provider.get_meter("oracle-delta-collector")
+
+        self.sysstat_rate = meter.create_gauge(
+            "oracle.delta.sysstat.rate", unit="1/s", description="Per-second rate of a v$sysstat counter")
+        self.sessions = meter.create_gauge(
+            "oracle.delta.sessions", unit="{session}", description="User sessions by status")
+        self.sql = {
+            name: meter.create_counter(name, unit=unit, description=f"Change in v$sql {name.rsplit('.', 1)[1]} per cursor")
+            for _, name, unit, _ in SQL_DELTA_COLUMNS
+        }
+        self.poll_duration = meter.create_histogram(
+            "oracle.delta.poll.duration", unit="ms", description="Time to poll one instance's v$ views")
+        self.poll_errors = meter.create_counter(
+            "oracle.delta.poll.errors", unit="{error}", description="Failed polls by instance and error type")
+
+
+class InstanceCollector:
+    """Polls one instance and diffs each snapshot against the previous one"""
+
+    def __init__(self, name, config, delta_metrics):
+        self.name = name
+        self.config = config
+        self.metrics = delta_metrics
+        self.pool = None
+        self.attributes = {"oracle.instance.role": name, "oracle.host": config['host']}
+        self.sysstat_sql = sysstat_query(DELTA_COLLECTOR_SYSSTATS)
+        # Previous snapshots
+        self.sysstat = None
+        self.sysstat_time = None
+        self.session_statuses = set()
+        self.cursors = {}  # (sql_id, child_number) -> row
+        self.watermark = None  # latest last_active_time seen
+
+    def get_pool(self):
+        # Created lazily so the agent can start before the databases are up
+        if self.pool is None:
+            self.pool = oracledb.create_pool(
+                user=ORACLE_MONITOR_USER,
+                password=ORACLE_MONITOR_PASSWORD,
+                dsn=f"{self.config['host']}:{self.config['port']}/{ORACLE_SID}",
+                min=1, max=DELTA_COLLECTOR_POOL_MAX, increment=1,
+                # Don't let an unreachable instance block its poll thread past the next interval
+                getmode=oracledb.POOL_GETMODE_TIMEDWAIT, wait_timeout=int(DELTA_COLLECTOR_INTERVAL * 1000),
+            )
+            print(f"[INFO] {self.name}: monitor pool created ({self.config['host']}:{self.config['port']})")
+        return self.pool
+
+    def run(self, stop):
+        """Poll on this instance's own fixed schedule until stop is set"""
+        next_poll = time.monotonic()
+        while not stop.is_set():
+            self.poll()
+            # A long poll shortens the next sleep instead of drifting
+            next_poll += DELTA_COLLECTOR_INTERVAL
+            stop.wait(max(0.0, next_poll - time.monotonic()))
+            next_poll = max(next_poll, time.monotonic())
+
+    def poll(self):
+        start = time.perf_counter()
+        try:
+            with self.get_pool().acquire() as connection:
+                cursor = connection.cursor()
+                self.poll_sysstat(cursor)
+                self.poll_sessions(cursor)
+                changed = self.poll_sql(cursor)
+                cursor.close()
+        except Exception as e:
+            self.metrics.poll_errors.add(1, {**self.attributes, "error.type": type(e).__name__})
+            print(f"[ERROR] {self.name}: poll failed: {e}")
+            return
+        duration_ms = (time.perf_counter() - start) * 1000
+        self.metrics.poll_duration.record(duration_ms, self.attributes)
+        debug(f"[POLL] {self.name}: {changed} changed cursors in {duration_ms:.1f}ms")
+
+    def poll_sysstat(self, cursor):
+        now = time.monotonic()
+        cursor.execute(self.sysstat_sql, DELTA_COLLECTOR_SYSSTATS)
+        current = dict(cursor.fetchall())
+
+        previous, previous_time = self.sysstat, self.sysstat_time
+        self.sysstat, self.sysstat_time = current, now
+        if previous is None:
+            return
+
+        elapsed = now - previous_time
+        for name, value in current.items():
+            before = previous.get(name)
+            # A counter that went backwards means the instance restarted - wait for the next poll
+            if before is None or value < before:
+                continue
+            self.metrics.sysstat_rate.set((value - before) / elapsed, {**self.attributes, "oracle.stat.name": name})
+
+    def poll_sessions(self, cursor):
+        cursor.execute(SESSIONS_SQL)
+        counts = dict(cursor.fetchall())
+        # Statuses with no sessions left drop out of the GROUP BY - report them as zero
+        self.session_statuses.update(counts)
+        for status in self.session_statuses:
+            self.metrics.sessions.set(counts.get(status, 0), {**self.attributes, "oracle.session.status": status})
+
+    def poll_sql(self, cursor):
+        """Send deltas for cursors whose counters moved since the last poll; returns how many changed"""
+        # The first poll reads every cursor once to establish the baseline and sends nothing
+        baseline = self.watermark is None
+        since = FIRST_POLL_SINCE if baseline else self.watermark
+
+        cursor.arraysize = 500
+        cursor.execute(SQL_STATS_SQL, schema=ORACLE_MONITOR_TARGET_USER, since=since)
+        rows = cursor.fetchall()
+
+        changed = 0
+        for row in rows:
+            key = (row[0], row[1])
+            last_active = row[10]
+            previous = self.cursors.get(key)
+            self.cursors[key] = row
+            if self.watermark is None or last_active > self.watermark:
+                self.watermark = last_active
+
+            # last_active_time has one second resolution and the watermark is inclusive, so
+            # cursors from the boundary second come back - possibly re-run within that second.
+            # Only unchanged counters are skipped; the snapshot above then holds the same values.
+            if baseline or (previous is not None and
+                            all(row[index] == previous[index] for index, _, _, _ in SQL_DELTA_COLUMNS)):
+                continue
+
+            changed += 1
+            attributes = {
+                **self.attributes,
+                "oracle.sql.id": row[0],
+                "oracle.sql.plan_hash_value": row[2],
+                "oracle.sql.module": row[3],
+            }
+            for index, name, _, scale in SQL_DELTA_COLUMNS:
+                value = row[index] or 0
+                delta = value - (previous[index] or 0) if previous is not None else value
+                # A cursor that was aged out and reloaded restarts from zero
+                if delta < 0:
+                    delta = value
+                if delta:
+                    self.metrics.sql[name].add(delta * scale, attributes)
+
+        self.forget_idle_cursors()
+        return changed
+
+    def forget_idle_cursors(self):
+        if self.watermark is None:
+            return
+        cutoff = self.watermark.timestamp() - DELTA_COLLECTOR_SQL_RETENTION
+        for key in [key for key, row in self.cursors.items() if row[10].timestamp() < cutoff]:
+            del self.cursors[key]
+
+
+def main():
+    unknown = [name for name in DELTA_COLLECTOR_INSTANCES if name not in ORACLE_INSTANCES]
+    if unknown:
+        print(f"[ERROR] Unknown instances in DELTA_COLLECTOR_INSTANCES: {', '.join(unknown)}")
+        return 1
+
+    delta_metrics = DeltaMetrics()
+    collectors = [InstanceCollector(name, ORACLE_INSTANCES[name], delta_metrics) for name in DELTA_COLLECTOR_INSTANCES]
+    print(f"[INFO] Polling {', '.join(DELTA_COLLECTOR_INSTANCES)} every {DELTA_COLLECTOR_INTERVAL}s, "
+          f"exporting to {OTEL_EXPORTER_OTLP_ENDPOINT}")
+
+    stop = threading.Event()
+    # One thread and schedule per instance, so a slow or hung instance delays only its own polls
+    threads = [threading.Thread(target=collector.run, args=(stop,), name=f"poll-{collector.name}", daemon=True)
+               for collector in collectors]
+    for thread in threads:
+        thread.start()
+    try:
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=1)
+    except KeyboardInterrupt:
+        print("[INFO] Stopping delta collector")
+        stop.set()
+        # A poll stuck in the driver is abandoned with its daemon thread
+        for thread in threads:
+            thread.join(timeout=DELTA_COLLECTOR_INTERVAL)
+    finally:
+        delta_metrics.provider.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
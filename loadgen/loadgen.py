@@ -4,6 +4,10 @@ import os
 import random
 import json
 import uuid
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from urllib.parse import urljoin
 
@@ -15,6 +19,26 @@ MIN_SLEEP = float(os.getenv("LOADGEN_MIN_SLEEP", "2"))
 MAX_SLEEP = float(os.getenv("LOADGEN_MAX_SLEEP", "8"))
 ENABLE_MULTI_INSTANCE_LOAD = os.getenv("ENABLE_MULTI_INSTANCE_LOAD", "true").lower() == "true"
 
+# Multi-process configuration - "auto" spawns one worker process per CPU core
+LOADGEN_WORKERS = os.getenv("LOADGEN_WORKERS", "1")
+LOADGEN_REPORT_INTERVAL = float(os.getenv("LOADGEN_REPORT_INTERVAL", "30"))
+LOADGEN_DURATION = float(os.getenv("LOADGEN_DURATION", "0"))  # 0 = run until stopped
+LOADGEN_MAX_OPERATIONS = int(os.getenv("LOADGEN_MAX_OPERATIONS", "0"))  # 0 = unlimited
+
+# Per-request console output is only printed at debug level
+LOADGEN_LOG_LEVEL = os.getenv("LOADGEN_LOG_LEVEL", "info").lower()
+DEBUG_LOGGING = LOADGEN_LOG_LEVEL == "debug"
+
+# Traffic capture and replay - LOADGEN_MODE=replay replays LOADGEN_REPLAY_FILE
+LOADGEN_MODE = os.getenv("LOADGEN_MODE", "generate").lower()
+LOADGEN_CAPTURE_FILE = os.getenv("LOADGEN_CAPTURE_FILE", "")
+LOADGEN_REPLAY_FILE = os.getenv("LOADGEN_REPLAY_FILE", "")
+LOADGEN_REPLAY_SPEED = os.getenv("LOADGEN_REPLAY_SPEED", "1")  # "1", "10", ... or "max"
+LOADGEN_REPLAY_CONCURRENCY = int(os.getenv("LOADGEN_REPLAY_CONCURRENCY", "32"))
+
+# Latency histogram bucket upper bounds in milliseconds
+LATENCY_BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 75, 100, 250, 500, 750, 1000, 1500, 2000, 3000, 5000, 7500, 10000, 15000]
+
 # Multi-instance load distribution for production-like scenarios
 ORACLE_INSTANCE_WEIGHTS = {
     'primary': {
@@ -34,6 +58,97 @@ ORACLE_INSTANCE_WEIGHTS = {
     }
 }
 
+def debug(message):
+    """Print per-request detail only when LOADGEN_LOG_LEVEL=debug"""
+    if DEBUG_LOGGING:
+        print(message)
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram that can be merged across worker processes"""
+    
+    def __init__(self, counts=None):
+        # One extra overflow bucket for samples above the largest bound
+        self.counts = list(counts) if counts else [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    
+    def record(self, duration):
+        """Record a duration given in seconds"""
+        duration_ms = duration * 1000
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if duration_ms <= bound:
+                self.counts[index] += 1
+                return
+        self.counts[-1] += 1
+    
+    def merge(self, other):
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+    
+    def total(self):
+        return sum(self.counts)
+    
+    def percentile(self, pct):
+        """Return the bucket upper bound (ms) containing the given percentile"""
+        total = self.total()
+        if total == 0:
+            return 0
+        threshold = total * pct / 100.0
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= threshold:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else float('inf')
+        return float('inf')
+    
+    def format_percentile(self, pct):
+        """Percentile as "<=bound ms", or "> largest bound" when it falls in the overflow bucket"""
+        bound = self.percentile(pct)
+        if bound == float('inf'):
+            return f">{LATENCY_BUCKETS_MS[-1]:g}ms"
+        return f"<={bound:g}ms"
+
+def parse_server_timing(header):
+    """Parse a Server-Timing header ("execute;dur=3.87, fetch;dur=0.41") into {phase: duration_ms}"""
+    phases = {}
+    if not header:
+        return phases
+    for entry in header.split(','):
+        parts = entry.strip().split(';')
+        name = parts[0].strip()
+        for param in parts[1:]:
+            key, _, value = param.strip().partition('=')
+            if key == 'dur' and name:
+                try:
+                    phases[name] = float(value)
+                except ValueError:
+                    pass
+    return phases
+
+class TrafficCapture:
+    """Appends one JSON line per request to a capture file that can be replayed later
+    
+    Record format (shared with the API's API_CAPTURE_FILE middleware):
+    {"ts": <epoch seconds>, "method": "GET", "path": "/api/employees", "headers": {...},
+     "body": <json or null>, "status": <int or null>, "duration_ms": <float>, "source": "loadgen"}
+    """
+    
+    def __init__(self, path, source="loadgen"):
+        # O_APPEND keeps single-write lines intact when several worker processes share the file
+        self.fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self.source = source
+    
+    def record(self, start_time, method, path, headers, body, status, duration):
+        line = json.dumps({
+            'ts': round(start_time, 6),
+            'method': method,
+            'path': path,
+            'headers': headers,
+            'body': body,
+            'status': status,
+            'duration_ms': round(duration * 1000, 3),
+            'source': self.source
+        }, separators=(',', ':'))
+        os.write(self.fd, (line + "\n").encode())
+
 def wait_for_services():
     """Wait for API service to be ready"""
     services = [
@@ -68,6 +183,22 @@ class DatabaseLoadGenerator:
             'Content-Type': 'application/json',
             'Cache-Control': 'no-cache'
         })
+        self.capture = TrafficCapture(LOADGEN_CAPTURE_FILE) if LOADGEN_CAPTURE_FILE else None
+    
+    def send(self, method, endpoint, headers, body=None):
+        """Send a request to the API, recording it to the capture file when enabled"""
+        api_url = urljoin(API_BASE_URL, endpoint)
+        start_time = time.time()
+        try:
+            response = self.session.request(method, api_url, json=body, headers=headers, timeout=15)
+        except requests.exceptions.RequestException:
+            if self.capture:
+                self.capture.record(start_time, method, endpoint, headers, body, None, time.time() - start_time)
+            raise
+        duration = time.time() - start_time
+        if self.capture:
+            self.capture.record(start_time, method, endpoint, headers, body, response.status_code, duration)
+        return response, duration
         
     def generate_correlation_id(self):
         """Generate a unique correlation ID for database operations"""
@@ -79,11 +210,8 @@ class DatabaseLoadGenerator:
         """Execute a database operation through the API"""
         correlation_id = self.generate_correlation_id()
         
-        print(f"[DATABASE] Executing {operation_type} operation on {target_instance} instance")
-        print(f"[CORRELATION] Generated correlation ID: {correlation_id}")
-        
-        # Make direct API call to trigger database operation
-        api_url = urljoin(API_BASE_URL, endpoint)
+        debug(f"[DATABASE] Executing {operation_type} operation on {target_instance} instance")
+        debug(f"[CORRELATION] Generated correlation ID: {correlation_id}")
         
         # Set operation context headers
         headers = {
@@ -96,11 +224,9 @@ class DatabaseLoadGenerator:
         }
         
         try:
-            print(f"[API] Calling {endpoint} -> {target_instance} database")
+            debug(f"[API] Calling {endpoint} -> {target_instance} database")
             
-            start_time = time.time()
-            response = self.session.get(api_url, headers=headers, timeout=15)
-            duration = time.time() - start_time
+            response, duration = self.send('GET', endpoint, headers)
             
             if response.status_code == 200:
                 data = response.json()
@@ -108,18 +234,18 @@ class DatabaseLoadGenerator:
                 query_type = data.get('query_type', 'unknown')
                 explain_plan = data.get('explain_plan_hint', 'N/A')
                 
-                print(f"[SUCCESS] Database operation completed: {query_type}")
-                print(f"[DATA] Records processed: {record_count}")
-                print(f"[PLAN] Execution plan: {explain_plan}")
-                print(f"[PERF] Response time: {duration:.3f}s")
-                print(f"[FLOW] Load Generator -> API -> {target_instance.upper()} Oracle -> OTEL Collector")
+                debug(f"[SUCCESS] Database operation completed: {query_type}")
+                debug(f"[DATA] Records processed: {record_count}")
+                debug(f"[PLAN] Execution plan: {explain_plan}")
+                debug(f"[PERF] Response time: {duration:.3f}s")
+                debug(f"[FLOW] Load Generator -> API -> {target_instance.upper()} Oracle -> OTEL Collector")
                 
                 # Verify correlation is present in response
                 returned_correlation = data.get('correlation_id')
                 if returned_correlation:
-                    print(f"[CORRELATION] Correlation preserved: {returned_correlation}")
+                    debug(f"[CORRELATION] Correlation preserved: {returned_correlation}")
                 else:
-                    print("[WARNING] Correlation ID not found in response")
+                    debug("[WARNING] Correlation ID not found in response")
                 
                 return {
                     'success': True,
@@ -128,7 +254,8 @@ class DatabaseLoadGenerator:
                     'record_count': record_count,
                     'duration': duration,
                     'explain_plan': explain_plan,
-                    'target_instance': target_instance
+                    'target_instance': target_instance,
+                    'phases': parse_server_timing(response.headers.get('Server-Timing'))
                 }
             else:
                 print(f"[ERROR] Database operation failed: {response.status_code} - {response.text}")
@@ -171,7 +298,7 @@ def select_target_instance_for_workload(workload_category):
     
     return preferred_instance
 
-def generate_realistic_load():
+def generate_realistic_load(load_generator=None):
     """Generate realistic database load across multiple Oracle instances with appropriate workload distribution"""
     
     # Realistic database operations with workload categorization
@@ -254,14 +381,16 @@ def generate_realistic_load():
     # Determine optimal target instance based on workload
     target_instance = select_target_instance_for_workload(selected_operation['workload_category'])
     
-    print(f"\n{'='*80}")
-    print(f"[SCENARIO] {selected_operation['description']}")
-    print(f"[WORKLOAD] {selected_operation['workload_category'].upper()} -> {target_instance.upper()} instance")
-    print(f"[CATEGORY] {selected_operation['category'].upper()} operation")
-    print(f"[ROUTING] Workload-optimized routing: {selected_operation['preferred_instance']} -> {target_instance}")
-    print(f"{'='*80}")
+    debug(f"\n{'='*80}")
+    debug(f"[SCENARIO] {selected_operation['description']}")
+    debug(f"[WORKLOAD] {selected_operation['workload_category'].upper()} -> {target_instance.upper()} instance")
+    debug(f"[CATEGORY] {selected_operation['category'].upper()} operation")
+    debug(f"[ROUTING] Workload-optimized routing: {selected_operation['preferred_instance']} -> {target_instance}")
+    debug(f"{'='*80}")
     
-    load_generator = DatabaseLoadGenerator()
+    # Reuse the caller's HTTP session so keep-alive connections survive between operations
+    if load_generator is None:
+        load_generator = DatabaseLoadGenerator()
     
     # Handle POST requests differently
     if selected_operation.get('method') == 'POST':
@@ -278,9 +407,9 @@ def simulate_employee_creation(load_generator, target_instance, workload_categor
     """Simulate creating a new employee through the API"""
     correlation_id = load_generator.generate_correlation_id()
     
-    print(f"[DATABASE] Executing INSERT operation on {target_instance} instance")
-    print(f"[WORKLOAD] Category: {workload_category}")
-    print(f"[CORRELATION] Generated correlation ID: {correlation_id}")
+    debug(f"[DATABASE] Executing INSERT operation on {target_instance} instance")
+    debug(f"[WORKLOAD] Category: {workload_category}")
+    debug(f"[CORRELATION] Generated correlation ID: {correlation_id}")
     
     # Generate realistic employee data
     first_names = ['Alex', 'Jordan', 'Casey', 'Taylor', 'Morgan', 'Riley', 'Cameron', 'Avery']
@@ -292,7 +421,6 @@ def simulate_employee_creation(load_generator, target_instance, workload_categor
         'salary': round(random.uniform(50000, 95000), 2)
     }
     
-    api_url = urljoin(API_BASE_URL, '/api/employees')
     headers = {
         'X-Database-Operation': 'insert-operation',
         'X-Correlation-ID': correlation_id,
@@ -304,22 +432,20 @@ def simulate_employee_creation(load_generator, target_instance, workload_categor
     }
     
     try:
-        print(f"[INSERT] Creating employee: {employee_data['first_name']} {employee_data['last_name']} -> {target_instance.upper()} database ({workload_category})")
+        debug(f"[INSERT] Creating employee: {employee_data['first_name']} {employee_data['last_name']} -> {target_instance.upper()} database ({workload_category})")
         
-        start_time = time.time()
-        response = load_generator.session.post(api_url, json=employee_data, headers=headers, timeout=15)
-        duration = time.time() - start_time
+        response, duration = load_generator.send('POST', '/api/employees', headers, employee_data)
         
         if response.status_code == 200:
             data = response.json()
             employee = data.get('employee', {})
             
-            print(f"[SUCCESS] Employee created successfully in {target_instance.upper()} database!")
-            print(f"[EMPLOYEE] Employee: {employee.get('first_name')} {employee.get('last_name')} (ID: {employee.get('employee_id')})")
-            print(f"[SALARY] Salary: ${employee.get('salary', 0):,.2f}")
-            print(f"[PERF] Response time: {duration:.3f}s")
-            print(f"[FLOW] Load Generator -> API -> {target_instance.upper()} Oracle ({workload_category}) -> OTEL Collector")
-            print(f"[INSTANCE] {target_instance} optimized for {ORACLE_INSTANCE_WEIGHTS[target_instance]['workload_types']}")
+            debug(f"[SUCCESS] Employee created successfully in {target_instance.upper()} database!")
+            debug(f"[EMPLOYEE] Employee: {employee.get('first_name')} {employee.get('last_name')} (ID: {employee.get('employee_id')})")
+            debug(f"[SALARY] Salary: ${employee.get('salary', 0):,.2f}")
+            debug(f"[PERF] Response time: {duration:.3f}s")
+            debug(f"[FLOW] Load Generator -> API -> {target_instance.upper()} Oracle ({workload_category}) -> OTEL Collector")
+            debug(f"[INSTANCE] {target_instance} optimized for {ORACLE_INSTANCE_WEIGHTS[target_instance]['workload_types']}")
             
             return {
                 'success': True,
@@ -327,7 +453,8 @@ def simulate_employee_creation(load_generator, target_instance, workload_categor
                 'query_type': 'employee_insert',
                 'duration': duration,
                 'employee': employee,
-                'target_instance': target_instance
+                'target_instance': target_instance,
+                'phases': parse_server_timing(response.headers.get('Server-Timing'))
             }
         else:
             print(f"[ERROR] Employee creation failed: {response.status_code} - {response.text}")
@@ -337,20 +464,300 @@ def simulate_employee_creation(load_generator, target_instance, workload_categor
         print(f"[ERROR] Request failed: {e}")
         return {'success': False, 'correlation_id': correlation_id, 'error': str(e), 'target_instance': target_instance}
 
-def print_statistics(stats):
+def new_statistics():
+    """Create an empty statistics structure (mergeable across worker processes)"""
+    return {
+        'success': 0,
+        'errors': 0,
+        'total_duration': 0,
+        'query_types': {},
+        'instance_distribution': {'primary': 0, 'secondary': 0, 'legacy': 0},
+        'correlations': 0,
+        'latency': LatencyHistogram(),
+        'phases': {}
+    }
+
+def record_result(stats, result):
+    """Fold a single operation result into the statistics"""
+    if result['success']:
+        stats['success'] += 1
+        duration = result.get('duration', 0)
+        stats['total_duration'] += duration
+        stats['latency'].record(duration)
+        
+        # Per-phase API timings from the Server-Timing response header
+        for phase_name, phase_ms in result.get('phases', {}).items():
+            if phase_name not in stats['phases']:
+                stats['phases'][phase_name] = LatencyHistogram()
+            stats['phases'][phase_name].record(phase_ms / 1000.0)
+        
+        query_type = result.get('query_type', 'unknown')
+        stats['query_types'][query_type] = stats['query_types'].get(query_type, 0) + 1
+        stats['correlations'] += 1
+        
+        # Track instance distribution (failed operations are not counted)
+        target_instance = result.get('target_instance', 'unknown')
+        if target_instance in stats['instance_distribution']:
+            stats['instance_distribution'][target_instance] += 1
+        
+        debug(f"[COUNTER] Total successful operations: {stats['success']}")
+    else:
+        stats['errors'] += 1
+        debug(f"[COUNTER] Total errors: {stats['errors']}")
+
+def merge_statistics(worker_stats):
+    """Merge per-worker statistics into a single report"""
+    merged = new_statistics()
+    for stats in worker_stats:
+        merged['success'] += stats['success']
+        merged['errors'] += stats['errors']
+        merged['total_duration'] += stats['total_duration']
+        merged['correlations'] += stats['correlations']
+        merged['latency'].merge(stats['latency'])
+        for query_type, count in stats['query_types'].items():
+            merged['query_types'][query_type] = merged['query_types'].get(query_type, 0) + count
+        for instance, count in stats['instance_distribution'].items():
+            merged['instance_distribution'][instance] = merged['instance_distribution'].get(instance, 0) + count
+        for phase_name, histogram in stats['phases'].items():
+            if phase_name not in merged['phases']:
+                merged['phases'][phase_name] = LatencyHistogram()
+            merged['phases'][phase_name].merge(histogram)
+    return merged
+
+def print_statistics(stats, workers=1):
     """Print load generation statistics"""
     total_requests = stats['success'] + stats['errors']
     success_rate = (stats['success'] / total_requests * 100) if total_requests > 0 else 0
     avg_duration = (stats['total_duration'] / stats['success']) if stats['success'] > 0 else 0
+    latency = stats['latency']
     
     print(f"\n[STATS] Database Load Generation Statistics:")
+    if workers > 1:
+        print(f"   Worker processes: {workers}")
     print(f"   Total operations: {total_requests}")
     print(f"   Successful: {stats['success']} ({success_rate:.1f}%)")
     print(f"   Errors: {stats['errors']}")
     print(f"   Average response time: {avg_duration:.3f}s")
+    print(f"   Latency p50/p90/p99: {latency.format_percentile(50)} / {latency.format_percentile(90)} / {latency.format_percentile(99)}")
+    if stats['phases']:
+        print(f"   API phase latency p50/p90/p99 (Server-Timing):")
+        for phase_name, histogram in stats['phases'].items():
+            print(f"     {phase_name}: {histogram.format_percentile(50)} / {histogram.format_percentile(90)} / {histogram.format_percentile(99)} (n={histogram.total()})")
     print(f"   Query types: {dict(stats['query_types'])}")
     print(f"   Instance distribution: {dict(stats['instance_distribution'])}")
-    print(f"   Correlations generated: {len(stats['correlations'])}")
+    # Every operation sends a fresh random correlation ID; counting them (not a set of them) keeps worker reports small
+    print(f"   Correlated operations: {stats['correlations']}")
+
+def resolve_worker_count():
+    """Resolve LOADGEN_WORKERS ("auto" = one per CPU core) to a process count"""
+    if LOADGEN_WORKERS.lower() == "auto":
+        return os.cpu_count() or 1
+    return max(1, int(LOADGEN_WORKERS))
+
+def run_load_loop(stats, max_operations=0, deadline=None, on_report=None):
+    """Run the operation/sleep schedule until the operation budget or deadline is reached"""
+    load_generator = DatabaseLoadGenerator()
+    operation_count = 0
+    next_report = time.time() + LOADGEN_REPORT_INTERVAL
+    
+    while True:
+        if max_operations and operation_count >= max_operations:
+            break
+        if deadline and time.time() >= deadline:
+            break
+        
+        operation_count += 1
+        
+        # Generate realistic database load
+        result = generate_realistic_load(load_generator)
+        record_result(stats, result)
+        
+        # Report statistics every reporting interval
+        if on_report and time.time() >= next_report:
+            on_report(stats)
+            next_report = time.time() + LOADGEN_REPORT_INTERVAL
+        
+        # Random sleep between operations (realistic database load)
+        sleep_time = random.uniform(MIN_SLEEP, MAX_SLEEP)
+        if deadline:
+            sleep_time = max(0, min(sleep_time, deadline - time.time()))
+        debug(f"[WAIT] Waiting {sleep_time:.1f}s before next operation...")
+        time.sleep(sleep_time)
+
+def worker_main(worker_id, max_operations, deadline, report_queue):
+    """Entry point for a load generation worker process"""
+    # Forked workers inherit the parent's RNG state - reseed so schedules diverge
+    random.seed()
+    stats = new_statistics()
+    
+    def report(current_stats):
+        report_queue.put(('interval', worker_id, current_stats))
+    
+    try:
+        run_load_loop(stats, max_operations, deadline, report)
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"[ERROR] Worker {worker_id} stopped unexpectedly: {e}")
+    finally:
+        report_queue.put(('final', worker_id, stats))
+
+def run_multi_process(workers, deadline):
+    """Spawn worker processes and merge their statistics at each interval and at the end"""
+    report_queue = multiprocessing.Queue()
+    processes = []
+    
+    # Split the operation budget so the workers together run the configured schedule
+    for worker_id in range(workers):
+        share = 0
+        if LOADGEN_MAX_OPERATIONS:
+            share = LOADGEN_MAX_OPERATIONS // workers + (1 if worker_id < LOADGEN_MAX_OPERATIONS % workers else 0)
+            if share == 0:
+                continue
+        process = multiprocessing.Process(target=worker_main, args=(worker_id, share, deadline, report_queue), daemon=True)
+        process.start()
+        processes.append(process)
+    
+    print(f"[INFO] Started {len(processes)} load generation worker processes")
+    
+    latest = {}
+    finished = set()
+    
+    def drain(timeout):
+        kind, worker_id, worker_stats = report_queue.get(timeout=timeout)
+        latest[worker_id] = worker_stats
+        if kind == 'final':
+            finished.add(worker_id)
+    
+    try:
+        next_report = time.time() + LOADGEN_REPORT_INTERVAL
+        while len(finished) < len(processes):
+            try:
+                drain(timeout=1)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    break
+            if time.time() >= next_report:
+                print_statistics(merge_statistics(latest.values()), len(processes))
+                next_report = time.time() + LOADGEN_REPORT_INTERVAL
+    except KeyboardInterrupt:
+        print(f"\n[STOP] Load generation stopped by user")
+        # Workers received the same interrupt - collect their final statistics
+        shutdown_deadline = time.time() + 10
+        while len(finished) < len(processes) and time.time() < shutdown_deadline:
+            try:
+                drain(timeout=1)
+            except (queue.Empty, KeyboardInterrupt):
+                pass
+    
+    for process in processes:
+        process.join(timeout=1)
+    
+    print_statistics(merge_statistics(latest.values()), len(processes))
+
+def load_capture(path):
+    """Load a capture file, ordered by original request start time"""
+    records = []
+    with open(path) as capture_file:
+        for line in capture_file:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    records.sort(key=lambda record: record['ts'])
+    return records
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+def replay_capture(path, speed="1"):
+    """Replay captured requests, reproducing the recorded inter-arrival times at the given speed"""
+    records = load_capture(path)
+    if not records:
+        print(f"[REPLAY] Capture file {path} is empty")
+        return []
+    
+    as_fast_as_possible = str(speed).lower() == "max"
+    speed_factor = 1.0 if as_fast_as_possible else float(speed)
+    print(f"[REPLAY] Replaying {len(records)} requests from {path} at {'max' if as_fast_as_possible else f'{speed_factor:g}x'} speed")
+    
+    # requests.Session is not thread-safe - keep one per dispatch thread
+    local = threading.local()
+    
+    def replay_one(record, scheduled_at):
+        generator = getattr(local, 'generator', None)
+        if generator is None:
+            generator = local.generator = DatabaseLoadGenerator()
+            # Replayed traffic is not re-captured (the capture file may be the replay source)
+            generator.capture = None
+        # Headers are replayed verbatim so traceparent/correlation IDs are preserved
+        headers = dict(record.get('headers') or {})
+        lag = max(0.0, time.time() - scheduled_at) if scheduled_at else 0.0
+        try:
+            response, duration = generator.send(record['method'], record['path'], headers, record.get('body'))
+            status = response.status_code
+        except requests.exceptions.RequestException as e:
+            debug(f"[REPLAY] {record['method']} {record['path']} failed: {e}")
+            status, duration = None, None
+        debug(f"[REPLAY] {record['method']} {record['path']} -> {status} in {duration or 0:.3f}s (recorded {record.get('duration_ms')}ms)")
+        return {
+            'path': record['path'],
+            'method': record['method'],
+            'recorded_status': record.get('status'),
+            'recorded_ms': record.get('duration_ms'),
+            'status': status,
+            'replay_ms': duration * 1000 if duration is not None else None,
+            'lag_ms': lag * 1000
+        }
+    
+    first_ts = records[0]['ts']
+    replay_start = time.time()
+    futures = []
+    with ThreadPoolExecutor(max_workers=LOADGEN_REPLAY_CONCURRENCY) as executor:
+        for record in records:
+            scheduled_at = None
+            if not as_fast_as_possible:
+                scheduled_at = replay_start + (record['ts'] - first_ts) / speed_factor
+                delay = scheduled_at - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+            futures.append(executor.submit(replay_one, record, scheduled_at))
+    
+    results = [future.result() for future in futures]
+    print_replay_report(results, time.time() - replay_start, (records[-1]['ts'] - first_ts))
+    return results
+
+def print_replay_report(results, replay_elapsed, recorded_elapsed):
+    """Print latency divergence between the replay and the original recording"""
+    print(f"\n[REPLAY] Replay Report:")
+    print(f"   Requests replayed: {len(results)}")
+    print(f"   Recorded span: {recorded_elapsed:.1f}s, replay wall time: {replay_elapsed:.1f}s")
+    
+    status_mismatches = sum(1 for result in results if result['status'] != result['recorded_status'])
+    print(f"   Status mismatches: {status_mismatches}")
+    
+    lags = [result['lag_ms'] for result in results]
+    print(f"   Dispatch lag p50/p99/max: {percentile(lags, 50):.1f}ms / {percentile(lags, 99):.1f}ms / {max(lags):.1f}ms")
+    
+    by_endpoint = {}
+    for result in results:
+        if result['replay_ms'] is None or result['recorded_ms'] is None:
+            continue
+        by_endpoint.setdefault(f"{result['method']} {result['path']}", []).append(result)
+    
+    print(f"   Latency divergence (replay - recorded) by endpoint:")
+    for endpoint, endpoint_results in sorted(by_endpoint.items()):
+        recorded = [result['recorded_ms'] for result in endpoint_results]
+        replayed = [result['replay_ms'] for result in endpoint_results]
+        divergence = [result['replay_ms'] - result['recorded_ms'] for result in endpoint_results]
+        print(f"     {endpoint}: n={len(endpoint_results)}"
+              f" recorded p50/p99={percentile(recorded, 50):.1f}/{percentile(recorded, 99):.1f}ms"
+              f" replay p50/p99={percentile(replayed, 50):.1f}/{percentile(replayed, 99):.1f}ms"
+              f" divergence mean={sum(divergence) / len(divergence):+.1f}ms p50={percentile(divergence, 50):+.1f}ms p99={percentile(divergence, 99):+.1f}ms")
 
 def main():
     print("[INFO] Starting Multi-Instance Oracle Database Load Generator")
@@ -366,58 +773,26 @@ def main():
     # Wait for all services to be ready
     wait_for_services()
     
-    # Initialize statistics
-    stats = {
-        'success': 0,
-        'errors': 0,
-        'total_duration': 0,
-        'query_types': {},
-        'instance_distribution': {'primary': 0, 'secondary': 0, 'legacy': 0},
-        'correlations': set()
-    }
+    if LOADGEN_MODE == "replay":
+        if not LOADGEN_REPLAY_FILE:
+            print("[ERROR] LOADGEN_MODE=replay requires LOADGEN_REPLAY_FILE")
+            return
+        replay_capture(LOADGEN_REPLAY_FILE, LOADGEN_REPLAY_SPEED)
+        return
     
-    operation_count = 0
+    workers = resolve_worker_count()
+    deadline = time.time() + LOADGEN_DURATION if LOADGEN_DURATION > 0 else None
+    
+    if workers > 1:
+        run_multi_process(workers, deadline)
+        return
+    
+    # Single-process mode
+    stats = new_statistics()
     
     try:
-        while True:
-            operation_count += 1
-            
-            # Generate realistic database load
-            result = generate_realistic_load()
-            
-            # Update statistics
-            if result['success']:
-                stats['success'] += 1
-                stats['total_duration'] += result.get('duration', 0)
-                
-                query_type = result.get('query_type', 'unknown')
-                stats['query_types'][query_type] = stats['query_types'].get(query_type, 0) + 1
-                stats['correlations'].add(result['correlation_id'])
-                
-                # Track instance distribution
-                target_instance = result.get('target_instance', 'unknown')
-                if target_instance in stats['instance_distribution']:
-                    stats['instance_distribution'][target_instance] += 1
-                
-                print(f"[COUNTER] Total successful operations: {stats['success']}")
-            else:
-                stats['errors'] += 1
-                # Track failed instance distribution
-                target_instance = result.get('target_instance', 'unknown')
-                if target_instance in stats['instance_distribution']:
-                    # Don't count failed operations in instance distribution
-                    pass
-                print(f"[COUNTER] Total errors: {stats['errors']}")
-            
-            # Print statistics every 10 operations
-            if operation_count % 10 == 0:
-                print_statistics(stats)
-            
-            # Random sleep between operations (realistic database load)
-            sleep_time = random.uniform(MIN_SLEEP, MAX_SLEEP)
-            print(f"[WAIT] Waiting {sleep_time:.1f}s before next operation...")
-            time.sleep(sleep_time)
-            
+        run_load_loop(stats, LOADGEN_MAX_OPERATIONS, deadline, print_statistics)
+        print_statistics(stats)
     except KeyboardInterrupt:
         print(f"\n[STOP] Load generation stopped by user")
         print_statistics(stats)
@@ -426,4 +801,4 @@ def main():
         print_statistics(stats)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -74,6 +74,35 @@ COMMIT;
 CREATE INDEX emp_salary_idx ON employees(salary);
 CREATE INDEX emp_hire_date_idx ON employees(hire_date);
 
+-- Change versions for the API's ETags (API_ETAG_VERSION=table): reading one is a unique
+-- lookup in an index-organized table, however large employees grows
+BEGIN
+    EXECUTE IMMEDIATE 'DROP TABLE table_versions';
+EXCEPTION
+    WHEN OTHERS THEN
+        IF SQLCODE != -942 THEN
+            RAISE;
+        END IF;
+END;
+/
+
+CREATE TABLE table_versions (
+    table_name     VARCHAR2(128) PRIMARY KEY,
+    version        NUMBER DEFAULT 0 NOT NULL
+) ORGANIZATION INDEX;
+
+INSERT INTO table_versions (table_name) VALUES ('EMPLOYEES');
+COMMIT;
+
+-- Statement-level, so a bulk insert bumps the version once. TRUNCATE and direct-path
+-- loads don't fire it - generate_employees.py bumps the version itself.
+CREATE OR REPLACE TRIGGER employees_version
+AFTER INSERT OR UPDATE OR DELETE ON employees
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'EMPLOYEES';
+END;
+/
+
 -- Create Oracle context for OpenTelemetry correlation tracking
 CREATE OR REPLACE CONTEXT OTEL_CTX USING DBMS_SESSION ACCESSED GLOBALLY;
 
@@ -83,12 +112,15 @@ GRANT EXECUTE ON DBMS_SESSION TO testuser;
 GRANT EXECUTE ON DBMS_APPLICATION_INFO TO testuser;
 GRANT SELECT ON V_$SESSION TO testuser;
 GRANT SELECT ON V_$SQL TO testuser;
+-- DBMS_XPLAN.DISPLAY_CURSOR for the API's plan capture
+GRANT SELECT ON V_$SQL_PLAN TO testuser;
+GRANT SELECT ON V_$SQL_PLAN_STATISTICS_ALL TO testuser;
 
 -- Verify all grants were successful
 SELECT grantee, privilege, table_name 
 FROM dba_tab_privs 
 WHERE grantee = 'TESTUSER' 
-  AND table_name IN ('V_$SESSION', 'V_$SQL')
+  AND table_name IN ('V_$SESSION', 'V_$SQL', 'V_$SQL_PLAN', 'V_$SQL_PLAN_STATISTICS_ALL')
 ORDER BY table_name;
 
 -- Final verification and completion message
@@ -101,6 +133,7 @@ BEGIN
         DBMS_OUTPUT.PUT_LINE('Schema creation completed successfully');
         DBMS_OUTPUT.PUT_LINE('EMPLOYEES table created with ' || emp_count || ' records');
         DBMS_OUTPUT.PUT_LINE('Indexes created: emp_salary_idx, emp_hire_date_idx');
+        DBMS_OUTPUT.PUT_LINE('TABLE_VERSIONS and employees_version trigger created');
         DBMS_OUTPUT.PUT_LINE('OTEL context created');
         DBMS_OUTPUT.PUT_LINE('Database ready for monitoring');
         DBMS_OUTPUT.PUT_LINE('=================================');
@@ -82,6 +82,9 @@ GRANT EXECUTE ON DBMS_SESSION TO testuser;
 GRANT EXECUTE ON DBMS_APPLICATION_INFO TO testuser;
 GRANT SELECT ON V_$SESSION TO testuser;
 GRANT SELECT ON V_$SQL TO testuser;
+-- DBMS_XPLAN.DISPLAY_CURSOR for the API's plan capture
+GRANT SELECT ON V_$SQL_PLAN TO testuser;
+GRANT SELECT ON V_$SQL_PLAN_STATISTICS_ALL TO testuser;
 
 -- Final verification
 SELECT 'SETUP COMPLETE - Users created:' AS status FROM dual;
@@ -0,0 +1,268 @@
+"""Synthetic employees generator and bulk loader
+
+Generates millions of employees with realistic salary and hire-date distributions and
+streams them into the TESTUSER.EMPLOYEES table in parallel chunks, so the FULL scan,
+INDEX range scan, GROUP BY and self-join plans behave like they would on production
+volumes. Output is reproducible: the same --seed always produces the same rows,
+regardless of --parallel.
+
+Usage:
+    python scripts/generate_employees.py --rows 2000000 --instance primary --gather-stats
+    python scripts/generate_employees.py --rows 5000000 --instance all --method direct --truncate
+    python scripts/generate_employees.py --rows 1000000 --dry-run   # generation throughput only
+
+Load methods:
+    array   Conventional array DML (executemany); each worker loads its own chunks over
+            its own connection, so loading scales with --parallel.
+    direct  Direct-path array inserts (APPEND_VALUES). Direct-path takes an exclusive table
+            lock, so workers generate chunks in parallel and a single session loads them.
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Connection settings - same environment variables as the API. The defaults are the compose
+# network's addresses, where every instance listens on 1521; from the host set
+# ORACLE_HOST_*=localhost and ORACLE_PORT_SECONDARY/LEGACY to the published 1522/1523.
+ORACLE_USER = os.getenv("ORACLE_USER", "testuser")
+ORACLE_PASSWORD = os.getenv("ORACLE_PASSWORD", "testpass")
+ORACLE_SID = os.getenv("ORACLE_SID", "XEPDB1")
+
+ORACLE_INSTANCES = {
+    'primary': {'host': os.getenv("ORACLE_HOST_PRIMARY", "oracle-db-primary"), 'port': int(os.getenv("ORACLE_PORT_PRIMARY", "1521"))},
+    'secondary': {'host': os.getenv("ORACLE_HOST_SECONDARY", "oracle-db-secondary"), 'port': int(os.getenv("ORACLE_PORT_SECONDARY", "1521"))},
+    'legacy': {'host': os.getenv("ORACLE_HOST_LEGACY", "oracle-db-legacy"), 'port': int(os.getenv("ORACLE_PORT_LEGACY", "1521"))},
+}
+
+# Generated IDs start above the seed data (1001-2007) and the API's random inserts (2000-9999)
+FIRST_EMPLOYEE_ID = 10000
+# employee_id is NUMBER(6) in create-schema.sql
+MAX_NUMBER6_ID = 999999
+
+FIRST_NAMES = [
+    'James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David', 'Elizabeth',
+    'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah', 'Charles', 'Karen',
+    'Alex', 'Jordan', 'Casey', 'Taylor', 'Morgan', 'Riley', 'Cameron', 'Avery', 'Priya', 'Wei',
+    'Mohammed', 'Fatima', 'Hiroshi', 'Yuki', 'Carlos', 'Sofia', 'Olga', 'Ivan', 'Aisha', 'Kwame'
+]
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+    'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin',
+    'Lee', 'Perez', 'Thompson', 'White', 'Harris', 'Sanchez', 'Clark', 'Ramirez', 'Lewis', 'Robinson',
+    'Patel', 'Nguyen', 'Kim', 'Chen', 'Tanaka', 'Okafor', 'Ivanov', 'Silva', 'Kowalski', 'Mensah'
+]
+
+# Hire dates count back from a fixed day, so a seed gives the same rows on any day it is run
+DEFAULT_REFERENCE_DATE = "2025-01-01"
+
+# Salary: log-normal around the median, plus a raise per year of tenure, clipped to NUMBER(8,2)
+SALARY_MEDIAN = 65000
+SALARY_SIGMA = 0.35
+SALARY_RAISE_PER_YEAR = 0.015
+SALARY_MIN = 30000
+SALARY_MAX = 400000
+
+# Hire dates: growing company - recent hires are more common (exponential tenure), weekdays only
+TENURE_MEAN_YEARS = 4.0
+TENURE_MAX_YEARS = 25.0
+
+
+def generate_chunk(seed, chunk_index, chunk_size, total_rows, reference_date):
+    """Generate one chunk of rows; deterministic for a given seed and chunk index"""
+    rng = random.Random(seed * 1_000_003 + chunk_index)
+    first_row = chunk_index * chunk_size
+    rows = []
+    for offset in range(min(chunk_size, total_rows - first_row)):
+        tenure_years = min(rng.expovariate(1.0 / TENURE_MEAN_YEARS), TENURE_MAX_YEARS)
+        hire_date = reference_date - timedelta(days=int(tenure_years * 365.25))
+        # Move weekend hires to the following Monday
+        if hire_date.weekday() >= 5:
+            hire_date += timedelta(days=7 - hire_date.weekday())
+            hire_date = min(hire_date, reference_date)
+
+        salary = rng.lognormvariate(math.log(SALARY_MEDIAN), SALARY_SIGMA) * (1 + SALARY_RAISE_PER_YEAR * tenure_years)
+        salary = round(min(max(salary, SALARY_MIN), SALARY_MAX), 2)
+
+        rows.append((
+            FIRST_EMPLOYEE_ID + first_row + offset,
+            rng.choice(FIRST_NAMES),
+            rng.choice(LAST_NAMES),
+            salary,
+            hire_date
+        ))
+    return rows
+
+
+def connect(instance):
+    import oracledb
+    config = ORACLE_INSTANCES[instance]
+    return oracledb.connect(f"{ORACLE_USER}/{ORACLE_PASSWORD}@{config['host']}:{config['port']}/{ORACLE_SID}")
+
+
+def insert_chunk(connection, rows, method):
+    """Insert one chunk with array DML and commit"""
+    import oracledb
+    hint = "/*+ APPEND_VALUES */" if method == "direct" else ""
+    cursor = connection.cursor()
+    cursor.setinputsizes(oracledb.NUMBER, 20, 25, oracledb.NUMBER, oracledb.DATETIME)
+    cursor.executemany(
+        f"INSERT {hint} INTO employees (employee_id, first_name, last_name, salary, hire_date) VALUES (:1, :2, :3, :4, :5)",
+        rows
+    )
+    # Direct-path inserts must be committed before the session touches the table again
+    connection.commit()
+    cursor.close()
+
+
+# Per-process connection for --method array workers
+worker_connection = None
+
+
+def init_worker(instance, method):
+    global worker_connection
+    if instance and method == "array":
+        worker_connection = connect(instance)
+
+
+def generate_and_load(task):
+    """Worker task: generate a chunk and, for array DML, load it over this worker's connection"""
+    seed, chunk_index, chunk_size, total_rows, reference_date, method, return_rows = task
+    rows = generate_chunk(seed, chunk_index, chunk_size, total_rows, reference_date)
+    if worker_connection is not None:
+        insert_chunk(worker_connection, rows, method)
+    # Only direct-path loading ships rows back to the single loader session
+    return chunk_index, len(rows), rows if return_rows else None
+
+
+def set_version_trigger(cursor, instance, enabled):
+    """Enable or disable the trigger that bumps the API's ETag version (see create-schema.sql)"""
+    try:
+        cursor.execute(f"ALTER TRIGGER employees_version {'ENABLE' if enabled else 'DISABLE'}")
+    except Exception as e:
+        # ORA-04080: a schema from before TABLE_VERSIONS has no trigger
+        if "ORA-04080" not in str(e):
+            raise
+        print(f"[LOAD] {instance}: no employees_version trigger, API ETags won't see this load")
+
+
+def prepare_table(instance, total_rows, truncate, method):
+    """Truncate and widen employee_id when the generated IDs exceed NUMBER(6)"""
+    connection = connect(instance)
+    cursor = connection.cursor()
+    if method == "direct":
+        # Oracle silently falls back to conventional inserts on a table with enabled triggers
+        set_version_trigger(cursor, instance, False)
+    if truncate:
+        print(f"[LOAD] {instance}: truncating employees")
+        cursor.execute("TRUNCATE TABLE employees")
+    if FIRST_EMPLOYEE_ID + total_rows - 1 > MAX_NUMBER6_ID:
+        print(f"[LOAD] {instance}: widening employee_id to NUMBER(10) for {total_rows:,} rows")
+        cursor.execute("ALTER TABLE employees MODIFY (employee_id NUMBER(10))")
+    cursor.close()
+    connection.close()
+
+
+def finish_table(instance, method):
+    """Re-enable the version trigger and bump the version for changes it didn't see"""
+    connection = connect(instance)
+    cursor = connection.cursor()
+    if method == "direct":
+        set_version_trigger(cursor, instance, True)
+    # TRUNCATE never fires the trigger, and direct-path loads ran with it disabled
+    try:
+        cursor.execute("UPDATE table_versions SET version = version + 1 WHERE table_name = 'EMPLOYEES'")
+        connection.commit()
+    except Exception as e:
+        if "ORA-00942" not in str(e):
+            raise
+    cursor.close()
+    connection.close()
+
+
+def gather_stats(instance, degree):
+    print(f"[STATS] {instance}: gathering optimizer statistics")
+    connection = connect(instance)
+    cursor = connection.cursor()
+    start = time.time()
+    cursor.callproc("DBMS_STATS.GATHER_TABLE_STATS", keyword_parameters={
+        'ownname': ORACLE_USER.upper(),
+        'tabname': 'EMPLOYEES',
+        'cascade': True,
+        'degree': degree
+    })
+    cursor.close()
+    connection.close()
+    print(f"[STATS] {instance}: statistics gathered in {time.time() - start:.1f}s")
+
+
+def load_instance(instance, args, reference_date):
+    """Generate and load all chunks for one instance (instance=None for --dry-run)"""
+    label = instance or "dry-run"
+    chunk_count = math.ceil(args.rows / args.chunk_size)
+    return_rows = instance is not None and args.method == "direct"
+    tasks = [(args.seed, index, args.chunk_size, args.rows, reference_date, args.method, return_rows)
+             for index in range(chunk_count)]
+
+    print(f"[LOAD] {label}: {args.rows:,} rows in {chunk_count} chunks of {args.chunk_size:,} "
+          f"({args.parallel} workers, method={args.method}, seed={args.seed})")
+    loaded = 0
+    try:
+        if instance:
+            prepare_table(instance, args.rows, args.truncate, args.method)
+        start = time.time()
+        direct_connection = connect(instance) if instance and args.method == "direct" else None
+        with multiprocessing.Pool(args.parallel, initializer=init_worker, initargs=(instance, args.method)) as pool:
+            for chunk_index, row_count, rows in pool.imap_unordered(generate_and_load, tasks):
+                if direct_connection is not None:
+                    insert_chunk(direct_connection, rows, args.method)
+                loaded += row_count
+                elapsed = time.time() - start
+                print(f"[LOAD] {label}: chunk {chunk_index + 1}/{chunk_count} - {loaded:,} rows, {loaded / elapsed:,.0f} rows/sec")
+        if direct_connection is not None:
+            direct_connection.close()
+    finally:
+        # Also after a failed load - partial loads change the table too
+        if instance:
+            finish_table(instance, args.method)
+
+    elapsed = time.time() - start
+    print(f"[DONE] {label}: {loaded:,} rows in {elapsed:.1f}s ({loaded / elapsed:,.0f} rows/sec)")
+
+    if instance and args.gather_stats:
+        gather_stats(instance, args.parallel)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate and bulk load synthetic employees")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="number of employees to generate")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (same seed = same rows)")
+    parser.add_argument("--instance", default="primary", choices=list(ORACLE_INSTANCES) + ["all"])
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="rows per array insert and commit")
+    parser.add_argument("--parallel", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--method", default="array", choices=["array", "direct"])
+    parser.add_argument("--truncate", action="store_true", help="truncate employees before loading")
+    parser.add_argument("--gather-stats", action="store_true", help="gather optimizer statistics afterwards")
+    parser.add_argument("--reference-date", default=DEFAULT_REFERENCE_DATE,
+                        help=f"YYYY-MM-DD that hire dates count back from (default: {DEFAULT_REFERENCE_DATE})")
+    parser.add_argument("--dry-run", action="store_true", help="generate rows without connecting to Oracle")
+    args = parser.parse_args()
+
+    reference_date = datetime.strptime(args.reference_date, "%Y-%m-%d")
+
+    if args.dry_run:
+        load_instance(None, args, reference_date)
+        return 0
+
+    instances = list(ORACLE_INSTANCES) if args.instance == "all" else [args.instance]
+    for instance in instances:
+        load_instance(instance, args, reference_date)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
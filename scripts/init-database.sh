@@ -181,6 +181,9 @@ GRANT EXECUTE ON DBMS_SESSION TO testuser;
 GRANT EXECUTE ON DBMS_APPLICATION_INFO TO testuser;
 GRANT SELECT ON V_\$SESSION TO testuser;
 GRANT SELECT ON V_\$SQL TO testuser;
+-- DBMS_XPLAN.DISPLAY_CURSOR for the API's plan capture
+GRANT SELECT ON V_\$SQL_PLAN TO testuser;
+GRANT SELECT ON V_\$SQL_PLAN_STATISTICS_ALL TO testuser;
 
 COMMIT;
 EXIT;
@@ -238,6 +241,35 @@ COMMIT;
 CREATE INDEX emp_salary_idx ON employees(salary);
 CREATE INDEX emp_hire_date_idx ON employees(hire_date);
 
+-- Change versions for the API's ETags (API_ETAG_VERSION=table): reading one is a unique
+-- lookup in an index-organized table, however large employees grows
+BEGIN
+    EXECUTE IMMEDIATE 'DROP TABLE table_versions';
+EXCEPTION
+    WHEN OTHERS THEN
+        IF SQLCODE != -942 THEN
+            NULL;
+        END IF;
+END;
+/
+
+CREATE TABLE table_versions (
+    table_name     VARCHAR2(128) PRIMARY KEY,
+    version        NUMBER DEFAULT 0 NOT NULL
+) ORGANIZATION INDEX;
+
+INSERT INTO table_versions (table_name) VALUES ('EMPLOYEES');
+COMMIT;
+
+-- Statement-level, so a bulk insert bumps the version once. TRUNCATE and direct-path
+-- loads don't fire it - generate_employees.py bumps the version itself.
+CREATE OR REPLACE TRIGGER employees_version
+AFTER INSERT OR UPDATE OR DELETE ON employees
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'EMPLOYEES';
+END;
+/
+
 -- Create Oracle context for OpenTelemetry correlation tracking
 CREATE OR REPLACE CONTEXT OTEL_CTX USING DBMS_SESSION ACCESSED GLOBALLY;
 
@@ -0,0 +1,35 @@
+#!/bin/bash
+
+# Offline Benchmark Script
+# Runs the API against the in-process fake Oracle backend and drives it with the
+# load generator - no Oracle instances, collector or network services required
+
+set -e
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+ROOT_DIR="$(dirname "$SCRIPT_DIR")"
+
+# Configuration (override via environment)
+API_PORT="${API_PORT:-8000}"
+export ORACLE_BACKEND=fake
+export OTEL_TRACES_EXPORTER="${OTEL_TRACES_EXPORTER:-none}"
+export OTEL_METRICS_EXPORTER="${OTEL_METRICS_EXPORTER:-none}"
+export ORACLE_CORRELATION_DELAY_SECONDS="${ORACLE_CORRELATION_DELAY_SECONDS:-0}"
+export FAKE_ORACLE_EMPLOYEES="${FAKE_ORACLE_EMPLOYEES:-10}"
+export FAKE_ORACLE_LATENCY_MS="${FAKE_ORACLE_LATENCY_MS:-0}"
+
+export API_BASE_URL="http://127.0.0.1:${API_PORT}"
+export LOADGEN_MIN_SLEEP="${LOADGEN_MIN_SLEEP:-0}"
+export LOADGEN_MAX_SLEEP="${LOADGEN_MAX_SLEEP:-0}"
+export LOADGEN_MAX_OPERATIONS="${LOADGEN_MAX_OPERATIONS:-1000}"
+export LOADGEN_WORKERS="${LOADGEN_WORKERS:-1}"
+
+echo "[INFO] Starting API on port ${API_PORT} with the fake Oracle backend"
+cd "$ROOT_DIR/api"
+python -m uvicorn main:app --host 127.0.0.1 --port "$API_PORT" --log-level warning &
+API_PID=$!
+trap 'kill $API_PID 2>/dev/null' EXIT
+
+echo "[INFO] Running load generator (${LOADGEN_MAX_OPERATIONS} operations)"
+cd "$ROOT_DIR/loadgen"
+python loadgen.py